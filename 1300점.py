@@ -1,3 +1,6 @@
+import heapq
+
+
 # ================================
 # Game 클래스: 게임 상태 관리
 # ================================
@@ -10,38 +13,130 @@ class Game:
         self.opponent_history = []
         self.turn = 1
 
-    def get_opponent_positions(self):
-        """필요할 때마다 opponent_history에서 계산"""
-        positions = set()
-        for r1, c1, r2, c2 in self.opponent_history:
-            for r in range(r1, r2 + 1):
-                for c in range(c1, c2 + 1):
-                    positions.add((r, c))
-        return positions
+        rows, cols = len(board), len(board[0])
+        # 칸별 소유자 (1: 내 땅, -1: 상대 땅, 0: 미점령), 게임 내내 유지
+        self.owner = [[0] * cols for _ in range(rows)]
+        # opp_prefix[r][c]: (0,0) ~ (r-1,c-1) 구간의 상대 땅 칸 수 (사각형의 탈환 칸 수를 O(1)로)
+        self.opp_prefix = [[0] * (cols + 1) for _ in range(rows + 1)]
+
+        # 누적합 테이블 (isValid를 O(1)로 만들기 위함)
+        # sum_table[r][c]: (0,0) ~ (r-1,c-1) 구간의 숫자 합
+        # row_count[r][c]: r행의 0 ~ c-1열 중 숫자가 남은 칸 수
+        # col_count[c][r]: c열의 0 ~ r-1행 중 숫자가 남은 칸 수
+        self.sum_table = [[0] * (cols + 1) for _ in range(rows + 1)]
+        self.row_count = [[0] * (cols + 1) for _ in range(rows)]
+        self.col_count = [[0] * (rows + 1) for _ in range(cols)]
+        self._patch_prefix(0, 0, rows - 1, cols - 1)
+
+        # 탐색 범위별 큰 사각형 힙 (처음 질의할 때 만들고, 이후에는 수마다 새로 유효해진 사각형만 넣음)
+        self.area_heaps = {}
+
+    def _rebuild_opp_prefix(self):
+        for r, row in enumerate(self.owner):
+            prev, cur = self.opp_prefix[r], self.opp_prefix[r + 1]
+            acc = 0
+            for c, value in enumerate(row):
+                acc += value == -1
+                cur[c + 1] = prev[c + 1] + acc
+
+    def _count_stolen(self, r1, c1, r2, c2):
+        # 사각형 안의 상대 땅 칸 수
+        p = self.opp_prefix
+        return p[r2 + 1][c2 + 1] - p[r1][c2 + 1] - p[r2 + 1][c1] + p[r1][c1]
+
+    def _valid_rectangles(self, r1=0, c1=0, r2=None, c2=None):
+        """
+        (r1, c1) ~ (r2, c2)와 겹치는 유효한 사각형 목록 (범위를 주지 않으면 보드 전체, 위 -> 아래 -> 왼 -> 오른 순서)
+        행 구간(top, bottom)마다 열별 합을 유지하며, left/right 두 포인터로 합이 정확히 10인 열 구간만 찾음
+        숫자가 모두 0 이상이므로 left가 커지면 합이 10 이상이 되는 right도 줄지 않음 -> O(R^2 * C)
+        왼/오른 변은 그 열의 구간 합이 0보다 크면 숫자가 있는 것이므로 위/아래 변만 따로 검사
+        (수를 둔 뒤에는 둔 칸과 겹치는 사각형만 유효성이 바뀔 수 있으므로 그 범위만 다시 구하면 됨)
+        """
+        board = self.board
+        rows, cols = len(board), len(board[0])
+        if r2 is None:
+            r2, c2 = rows - 1, cols - 1
+        row_count = self.row_count
+        rects = []
+        for top in range(r2 + 1):
+            col_sum = [0] * cols  # top ~ bottom행의 열별 합
+            top_count = row_count[top]
+            for bottom in range(top, rows):
+                row = board[bottom]
+                for c in range(cols):
+                    col_sum[c] += row[c]
+                if bottom < r1:
+                    continue
+                bottom_count = row_count[bottom]
+
+                right = 0  # 창은 left ~ right-1열
+                window = 0
+                for left in range(c2 + 1):
+                    while window < 10 and right < cols:
+                        window += col_sum[right]
+                        right += 1
+                    if window < 10:
+                        break
+                    # 합 10에 도달시킨 마지막 열(right-1)은 합이 0보다 크므로 오른 변은 항상 만족
+                    if (
+                        window == 10
+                        and right > c1
+                        and col_sum[left]
+                        and top_count[right] != top_count[left]
+                        and bottom_count[right] != bottom_count[left]
+                    ):
+                        rects.append((top, left, bottom, right - 1))
+                    window -= col_sum[left]
+        return rects
+
+    def _patch_prefix(self, r1, c1, r2, c2):
+        """(r1, c1) ~ (r2, c2) 칸이 바뀐 뒤 영향을 받는 누적합 구간만 다시 계산"""
+        board = self.board
+        rows, cols = len(board), len(board[0])
+
+        # 행/열 누적합: 바뀐 행(열)의 c1(r1) 이후만 갱신
+        for r in range(r1, r2 + 1):
+            row = board[r]
+            counts = self.row_count[r]
+            acc = counts[c1]
+            for c in range(c1, cols):
+                if row[c] != 0:
+                    acc += 1
+                counts[c + 1] = acc
+        for c in range(c1, c2 + 1):
+            counts = self.col_count[c]
+            acc = counts[r1]
+            for r in range(r1, rows):
+                if board[r][c] != 0:
+                    acc += 1
+                counts[r + 1] = acc
+
+        # 2차원 누적합: (r1, c1)보다 오른쪽 아래 구간만 갱신
+        sum_table = self.sum_table
+        for r in range(r1, rows):
+            row = board[r]
+            prev_sum, cur_sum = sum_table[r], sum_table[r + 1]
+            line_sum = cur_sum[c1] - prev_sum[c1]
+            for c in range(c1, cols):
+                line_sum += row[c]
+                cur_sum[c + 1] = prev_sum[c + 1] + line_sum
 
     # 사각형 (r1, c1) ~ (r2, c2)이 유효한지 검사 (합이 10이고, 네 변을 모두 포함)
     def isValid(self, r1, c1, r2, c2):
-        """메모리 최적화된 유효성 검사"""
-        sums = 0
-        border_flags = 0  # 비트마스크로 4개 플래그를 1개 변수로
-        # bit 0: top, bit 1: bottom, bit 2: left, bit 3: right
-        
-        for r in range(r1, r2 + 1):
-            for c in range(c1, c2 + 1):
-                if self.board[r][c] != 0:
-                    sums += self.board[r][c]
-                    # 조기 종료: 합이 10 초과
-                    if sums > 10:
-                        return False
-                    
-                    # 비트마스크로 테두리 플래그 업데이트
-                    if r == r1: border_flags |= 1  # bit 0
-                    if r == r2: border_flags |= 2  # bit 1  
-                    if c == c1: border_flags |= 4  # bit 2
-                    if c == c2: border_flags |= 8  # bit 3
-        
-        # 합이 10이고 모든 테두리가 커버되는지 확인 (15 = 1111 in binary)
-        return sums == 10 and border_flags == 15
+        """누적합 테이블 기반 O(1) 유효성 검사"""
+        s = self.sum_table
+        if s[r2 + 1][c2 + 1] - s[r1][c2 + 1] - s[r2 + 1][c1] + s[r1][c1] != 10:
+            return False
+
+        # 네 변(위/아래 행, 왼/오른 열)에 숫자가 하나 이상 남아 있어야 함
+        top, bottom = self.row_count[r1], self.row_count[r2]
+        left, right = self.col_count[c1], self.col_count[c2]
+        return (
+            top[c2 + 1] != top[c1]
+            and bottom[c2 + 1] != bottom[c1]
+            and left[r2 + 1] != left[r1]
+            and right[r2 + 1] != right[r1]
+        )
 
     # ================================================================
     # ===================== [필수 구현] ===============================
@@ -92,54 +187,47 @@ class Game:
     #                                 return True  # 위험
     #     return False  # 안전
 
+    def _push_area(self, heap, rect):
+        # 높이 -> 너비가 큰 순서, 같으면 위 -> 왼쪽 순서 (예전 "큰 것부터 탐색"과 같은 순서)
+        r1, c1, r2, c2 = rect
+        heapq.heappush(heap, (r1 - r2, c1 - c2, r1, c1, r2, c2))
+
     def _find_max_area_rectangle(self, r_start, r_end, c_start, c_end):
-        """주어진 범위에서 최대 면적 사각형 찾기 - 큰 것부터 탐색"""
-        bestMove = (-1, -1, -1, -1)
-        max_height = r_end - r_start
-        max_width = c_end - c_start
-        
-        # 큰 면적부터 탐색 (조기 종료)
-        for height in range(max_height, 0, -1):
-            for width in range(max_width, 0, -1):
-                # 해당 높이와 너비로 가능한 모든 위치 검사
-                for r1 in range(r_start, r_end - height + 1):
-                    r2 = r1 + height - 1
-                    for c1 in range(c_start, c_end - width + 1):
-                        c2 = c1 + width - 1
-                        
-                        if self.isValid(r1, c1, r2, c2):
-                            bestMove = (r1, c1, r2, c2)
-                            # 첫 번째로 찾은 것이 최대 면적이므로 즉시 반환
-                            return bestMove
-        
-        # 아무것도 찾지 못한 경우
-        return bestMove
+        """주어진 범위에서 최대 면적 사각형 찾기 - 범위별 힙의 맨 위 (무효가 된 항목은 꺼내 버림)"""
+        region = (r_start, r_end, c_start, c_end)
+        heap = self.area_heaps.get(region)
+        if heap is None:
+            heap = []
+            for rect in self._valid_rectangles():
+                if r_start <= rect[0] and rect[2] < r_end and c_start <= rect[1] and rect[3] < c_end:
+                    self._push_area(heap, rect)
+            self.area_heaps[region] = heap
+
+        while heap:
+            r1, c1, r2, c2 = heap[0][2:]
+            if self.isValid(r1, c1, r2, c2):
+                return (r1, c1, r2, c2)
+            heapq.heappop(heap)
 
+        # 아무것도 찾지 못한 경우
+        return (-1, -1, -1, -1)
 
-    def _find_max_steal_rectangle(self, opp_r1, opp_c1, opp_r2, opp_c2):
-        """상대 사각형 주변에서 최대 steal 사각형 찾기"""
-        N = len(self.board)
-        opponent_positions = self.get_opponent_positions()
 
+    def _find_max_steal_rectangle(self):
+        """보드 전체의 유효한 사각형 중 상대 땅을 가장 많이 빼앗는 사각형 찾기 (같으면 넓은 것)"""
         max_steal = -1
+        max_area = 0
         best_rect = (-1, -1, -1, -1)
 
-        for r1 in range(max(0, opp_r1 - 3), min(N, opp_r2 + 4)):
-            for r2 in range(r1, min(N, r1 + 8)):
-                for c1 in range(max(0, opp_c1 - 3), min(N, opp_c2 + 4)):
-                    for c2 in range(c1, min(N, c1 + 8)):
-                        if self.isValid(r1, c1, r2, c2):
-                            steal_count = sum(
-                                (r, c) in opponent_positions
-                                for r in range(r1, r2 + 1)
-                                for c in range(c1, c2 + 1)
-                            )
-                            area = (r2 - r1 + 1) * (c2 - c1 + 1)
-
-                            # 가장 많이 탈환하면서, 넓은 사각형 우선
-                            if steal_count > max_steal or (steal_count == max_steal and area > (best_rect[2] - best_rect[0] + 1) * (best_rect[3] - best_rect[1] + 1)):
-                                max_steal = steal_count
-                                best_rect = (r1, c1, r2, c2)
+        for r1, c1, r2, c2 in self._valid_rectangles():
+            steal_count = self._count_stolen(r1, c1, r2, c2)
+            area = (r2 - r1 + 1) * (c2 - c1 + 1)
+
+            # 가장 많이 탈환하면서, 넓은 사각형 우선
+            if steal_count > max_steal or (steal_count == max_steal and area > max_area):
+                max_steal = steal_count
+                max_area = area
+                best_rect = (r1, c1, r2, c2)
 
         return best_rect
 
@@ -161,8 +249,7 @@ class Game:
                     bestMove = self._find_max_area_rectangle(r_start, r_end, c_start, c_end)
                 else:
                     # 상대가 수를 둠: steal 전략
-                    opp_r1, opp_c1, opp_r2, opp_c2 = self.opponent_history[-1]
-                    bestMove = self._find_max_steal_rectangle(opp_r1, opp_c1, opp_r2, opp_c2)
+                    bestMove = self._find_max_steal_rectangle()
                     if bestMove == (-1, -1, -1, -1):
                         r_start, r_end, c_start, c_end = self._get_quadrant_range(rows, cols)
                         bestMove = self._find_max_area_rectangle(r_start, r_end, c_start, c_end)
@@ -178,9 +265,8 @@ class Game:
                     r_start, r_end, c_start, c_end = self._get_quadrant_range(rows, cols)
                     bestMove = self._find_max_area_rectangle(r_start, r_end, c_start, c_end)
                 else:
-                    # 상대가 수를 둠: steal 전략 (후공은 8칸 제한)
-                    opp_r1, opp_c1, opp_r2, opp_c2 = self.opponent_history[-1]
-                    bestMove = self._find_max_steal_rectangle(opp_r1, opp_c1, opp_r2, opp_c2)
+                    # 상대가 수를 둠: steal 전략
+                    bestMove = self._find_max_steal_rectangle()
                     if bestMove == (-1, -1, -1, -1):
                         r_start, r_end, c_start, c_end = self._get_quadrant_range(rows, cols)
                         bestMove = self._find_max_area_rectangle(r_start, r_end, c_start, c_end)
@@ -191,18 +277,29 @@ class Game:
 
     # 상대방의 수를 받아 보드에 반영
     def updateOpponentAction(self, action, _time):
-        self.opponent_history = [action]  # 리스트 초기화
+        self.opponent_history.append(action)
 
         self.updateMove(*action, False)
 
     # 주어진 수를 보드에 반영 (칸을 0으로 지움)
-    def updateMove(self, r1, c1, r2, c2, _isMyMove):
+    def updateMove(self, r1, c1, r2, c2, isMyMove):
         if r1 == c1 == r2 == c2 == -1:
             self.passed = True
             return
+        mark = 1 if isMyMove else -1
         for r in range(r1, r2 + 1):
             for c in range(c1, c2 + 1):
                 self.board[r][c] = 0
+                self.owner[r][c] = mark
+        self._patch_prefix(r1, c1, r2, c2)
+        self._rebuild_opp_prefix()
+
+        # 새로 유효해졌을 수 있는 사각형(둔 칸과 겹치는 것)을 범위별 힙에 넣음 (이미 있던 것은 중복돼도 무방)
+        if self.area_heaps:
+            for rect in self._valid_rectangles(r1, c1, r2, c2):
+                for (r_start, r_end, c_start, c_end), heap in self.area_heaps.items():
+                    if r_start <= rect[0] and rect[2] < r_end and c_start <= rect[1] and rect[3] < c_end:
+                        self._push_area(heap, rect)
         self.passed = False
 
 
@@ -1,4 +1,5 @@
 import math
+import random
 from copy import deepcopy
 
 """
@@ -17,6 +18,56 @@ BOARD_COLUMN = 17 # (0,0) ~ (0,16)
 # 패스할 때 사용하는 무효 좌표
 PASS = [-1, -1, -1, -1]
 
+# Zobrist 해시 키 (칸마다: 숫자가 지워짐 / 내 땅 / 상대 땅), 실행마다 같은 값이 나오도록 시드 고정
+_zobrist_rng = random.Random(20250805)
+ZOBRIST_CLEARED = [_zobrist_rng.getrandbits(64) for _ in range(BOARD_ROW * BOARD_COLUMN)]
+ZOBRIST_OWNER = {
+    1: [_zobrist_rng.getrandbits(64) for _ in range(BOARD_ROW * BOARD_COLUMN)],  # 내 땅
+    -1: [_zobrist_rng.getrandbits(64) for _ in range(BOARD_ROW * BOARD_COLUMN)],  # 상대 땅
+}
+ZOBRIST_OPP_TO_MOVE = _zobrist_rng.getrandbits(64)  # 상대 차례인 국면 구분용
+
+# 치환표 항목의 값 종류
+TT_EXACT = 0
+TT_LOWER = 1  # 실제 값 >= value (beta 컷)
+TT_UPPER = 2  # 실제 값 <= value (alpha 이하)
+
+# 치환표 버킷 수 (2의 거듭제곱), 버킷당 2칸이라 항목은 최대 2배
+TT_BUCKETS = 1 << 16
+
+
+class TranspositionTable:
+    """
+    크기가 고정된 치환표
+    버킷마다 깊이 우선 칸(depth-preferred)과 항상 교체 칸(always-replace)을 둠
+    항목: (key, depth, flag, value, move)
+    """
+
+    def __init__(self, buckets=TT_BUCKETS):
+        self.mask = buckets - 1
+        self.deep = [None] * buckets
+        self.recent = [None] * buckets
+
+    def probe(self, key):
+        index = key & self.mask
+        entry = self.deep[index]
+        if entry is not None and entry[0] == key:
+            return entry
+        entry = self.recent[index]
+        if entry is not None and entry[0] == key:
+            return entry
+        return None
+
+    def store(self, key, depth, flag, value, move):
+        index = key & self.mask
+        entry = (key, depth, flag, value, move)
+        old = self.deep[index]
+        # 더 깊게 탐색한 결과(또는 같은 국면)는 깊이 우선 칸, 나머지는 항상 교체 칸
+        if old is None or old[0] == key or depth >= old[1]:
+            self.deep[index] = entry
+        else:
+            self.recent[index] = entry
+
 
 class Game:
     def __init__(self, board, first):
@@ -26,32 +77,113 @@ class Game:
         self.territory_board = [
             [0 for _ in range(BOARD_COLUMN)] for _ in range(BOARD_ROW)
         ]
+        # 현재 국면의 Zobrist 해시 (칸을 바꿀 때마다 바뀐 칸의 키만 XOR)
+        self.hash = 0
+        self.tt = TranspositionTable()
         self.turn = 0
         # self.first = first (필요시 활성화)
 
-        # 사각형 (r1, c1) ~ (r2, c2)이 유효한지 검사 (합이 10이고, 네 변을 모두 포함)
-    def isValid(self, r1, c1, r2, c2):
-        """메모리 최적화된 유효성 검사"""
-        sums = 0
-        border_flags = 0  # 비트마스크로 4개 플래그를 1개 변수로
-        # bit 0: top, bit 1: bottom, bit 2: left, bit 3: right
-        
+        # 누적합 테이블 (isValid를 O(1)로 만들기 위함)
+        # sum_table[r][c]: (0,0) ~ (r-1,c-1) 구간의 숫자 합
+        # row_count[r][c]: r행의 0 ~ c-1열 중 숫자가 남은 칸 수
+        # col_count[c][r]: c열의 0 ~ r-1행 중 숫자가 남은 칸 수
+        self.sum_table = [[0] * (BOARD_COLUMN + 1) for _ in range(BOARD_ROW + 1)]
+        self.row_count = [[0] * (BOARD_COLUMN + 1) for _ in range(BOARD_ROW)]
+        self.col_count = [[0] * (BOARD_ROW + 1) for _ in range(BOARD_COLUMN)]
+        self._patch_prefix(0, 0, BOARD_ROW - 1, BOARD_COLUMN - 1)
+
+    def _patch_prefix(self, r1, c1, r2, c2):
+        """(r1, c1) ~ (r2, c2) 칸이 바뀐 뒤 영향을 받는 누적합 구간만 다시 계산"""
+        board = self.board
+
+        # 행/열 누적합: 바뀐 행(열)의 c1(r1) 이후만 갱신
         for r in range(r1, r2 + 1):
-            for c in range(c1, c2 + 1):
-                if self.board[r][c] != 0:
-                    sums += self.board[r][c]
-                    # 조기 종료: 합이 10 초과
-                    if sums > 10:
-                        return False
-                    
-                    # 비트마스크로 테두리 플래그 업데이트
-                    if r == r1: border_flags |= 1  # bit 0
-                    if r == r2: border_flags |= 2  # bit 1  
-                    if c == c1: border_flags |= 4  # bit 2
-                    if c == c2: border_flags |= 8  # bit 3
-        
-        # 합이 10이고 모든 테두리가 커버되는지 확인 (15 = 1111 in binary)
-        return sums == 10 and border_flags == 15
+            row = board[r]
+            counts = self.row_count[r]
+            acc = counts[c1]
+            for c in range(c1, BOARD_COLUMN):
+                if row[c] != 0:
+                    acc += 1
+                counts[c + 1] = acc
+        for c in range(c1, c2 + 1):
+            counts = self.col_count[c]
+            acc = counts[r1]
+            for r in range(r1, BOARD_ROW):
+                if board[r][c] != 0:
+                    acc += 1
+                counts[r + 1] = acc
+
+        # 2차원 누적합: (r1, c1)보다 오른쪽 아래 구간만 갱신
+        sum_table = self.sum_table
+        for r in range(r1, BOARD_ROW):
+            row = board[r]
+            prev_sum, cur_sum = sum_table[r], sum_table[r + 1]
+            line_sum = cur_sum[c1] - prev_sum[c1]
+            for c in range(c1, BOARD_COLUMN):
+                line_sum += row[c]
+                cur_sum[c + 1] = prev_sum[c + 1] + line_sum
+
+    # 사각형 (r1, c1) ~ (r2, c2)이 유효한지 검사 (합이 10이고, 네 변을 모두 포함)
+    def isValid(self, r1, c1, r2, c2):
+        """누적합 테이블 기반 O(1) 유효성 검사"""
+        s = self.sum_table
+        if s[r2 + 1][c2 + 1] - s[r1][c2 + 1] - s[r2 + 1][c1] + s[r1][c1] != 10:
+            return False
+
+        # 네 변(위/아래 행, 왼/오른 열)에 숫자가 하나 이상 남아 있어야 함
+        top, bottom = self.row_count[r1], self.row_count[r2]
+        left, right = self.col_count[c1], self.col_count[c2]
+        return (
+            top[c2 + 1] != top[c1]
+            and bottom[c2 + 1] != bottom[c1]
+            and left[r2 + 1] != left[r1]
+            and right[r2 + 1] != right[r1]
+        )
+
+    def _valid_rectangles(self, r1=0, c1=0, r2=None, c2=None):
+        """
+        (r1, c1) ~ (r2, c2)와 겹치는 유효한 사각형 목록 (범위를 주지 않으면 보드 전체, 위 -> 아래 -> 왼 -> 오른 순서)
+        행 구간(top, bottom)마다 열별 합을 유지하며, left/right 두 포인터로 합이 정확히 10인 열 구간만 찾음
+        숫자가 모두 0 이상이므로 left가 커지면 합이 10 이상이 되는 right도 줄지 않음 -> O(R^2 * C)
+        왼/오른 변은 그 열의 구간 합이 0보다 크면 숫자가 있는 것이므로 위/아래 변만 따로 검사
+        (수를 둔 뒤에는 둔 칸과 겹치는 사각형만 유효성이 바뀔 수 있으므로 그 범위만 다시 구하면 됨)
+        """
+        board = self.board
+        rows, cols = len(board), len(board[0])
+        if r2 is None:
+            r2, c2 = rows - 1, cols - 1
+        row_count = self.row_count
+        rects = []
+        for top in range(r2 + 1):
+            col_sum = [0] * cols  # top ~ bottom행의 열별 합
+            top_count = row_count[top]
+            for bottom in range(top, rows):
+                row = board[bottom]
+                for c in range(cols):
+                    col_sum[c] += row[c]
+                if bottom < r1:
+                    continue
+                bottom_count = row_count[bottom]
+
+                right = 0  # 창은 left ~ right-1열
+                window = 0
+                for left in range(c2 + 1):
+                    while window < 10 and right < cols:
+                        window += col_sum[right]
+                        right += 1
+                    if window < 10:
+                        break
+                    # 합 10에 도달시킨 마지막 열(right-1)은 합이 0보다 크므로 오른 변은 항상 만족
+                    if (
+                        window == 10
+                        and right > c1
+                        and col_sum[left]
+                        and top_count[right] != top_count[left]
+                        and bottom_count[right] != bottom_count[left]
+                    ):
+                        rects.append((top, left, bottom, right - 1))
+                    window -= col_sum[left]
+        return rects
 
     def _calculate_board_value(self):
         # 현재 territory_board 기준으로 점수 계산
@@ -78,34 +210,50 @@ class Game:
         if depth == DEPTH or self.turn == 10    :
             return color * self._calculate_board_value(), PASS
 
-        for r1 in range(BOARD_ROW):
-            for r2 in range(r1, BOARD_ROW):
-                for c1 in range(BOARD_COLUMN):
-                    for c2 in range(c1, BOARD_COLUMN):
-                        if not self.isValid(r1, c1, r2, c2):
-                            continue
-
-                        is_terminal = False
-                        self.updateMove(r1, c1, r2, c2, color == 1)
-
-                        # 다음 턴: color 뒤집어서 상대 입장
-                        value, _ = self._simulate_negamax(-beta, -alpha, depth + 1, -color)
-                        value = -value  # 점수 반전
-
-                        if value > best_value:
-                            best_value = value
-                            best_move = [r1, c1, r2, c2]
-                            alpha = max(alpha, value)
-
-                        self.restoreMove(r1, c1, r2, c2, original_board, original_territory_board)
-
-                        if alpha >= beta:
-                            return alpha, best_move
+        # 치환표 확인: 같은 국면을 남은 깊이 이상으로 탐색한 적이 있으면 재사용
+        remaining = DEPTH - depth
+        key = self.hash if color == 1 else self.hash ^ ZOBRIST_OPP_TO_MOVE
+        entry = self.tt.probe(key)
+        if entry is not None and entry[1] >= remaining:
+            _, _, flag, value, move = entry
+            if flag == TT_EXACT:
+                return value, move
+            if flag == TT_LOWER:
+                alpha = max(alpha, value)
+            else:
+                beta = min(beta, value)
+            if alpha >= beta:
+                return value, move
+        alpha_orig = alpha
+
+        original_hash = self.hash
+        # 유효한 사각형 목록을 먼저 만들어 둠 (탐색 중 보드가 바뀌었다 되돌아오므로)
+        for r1, c1, r2, c2 in self._valid_rectangles():
+            is_terminal = False
+            self.updateMove(r1, c1, r2, c2, color == 1)
+
+            # 다음 턴: color 뒤집어서 상대 입장
+            value, _ = self._simulate_negamax(-beta, -alpha, depth + 1, -color)
+            value = -value  # 점수 반전
+
+            if value > best_value:
+                best_value = value
+                best_move = [r1, c1, r2, c2]
+                alpha = max(alpha, value)
+
+            self.restoreMove(r1, c1, r2, c2, original_board, original_territory_board)
+            self.hash = original_hash
+
+            if alpha >= beta:
+                self.tt.store(key, remaining, TT_LOWER, alpha, best_move)
+                return alpha, best_move
 
         if is_terminal:
             return color * self._calculate_board_value(), PASS
-        else:
-            return best_value, best_move
+
+        flag = TT_UPPER if best_value <= alpha_orig else TT_EXACT
+        self.tt.store(key, remaining, flag, best_value, best_move)
+        return best_value, best_move
 
     def calculateMove(self, _myTime, _oppTime) -> list[int]:
         """
@@ -126,10 +274,21 @@ class Game:
         # 수를 보드에 적용
         if r1 == c1 == r2 == c2 == -1:
             return
+        owner = 1 if is_my_turn else -1
         for r in range(r1, r2 + 1):
             for c in range(c1, c2 + 1):
+                # 해시 갱신: 새로 지워진 칸, 소유자가 바뀐 칸의 키만 XOR
+                cell = r * BOARD_COLUMN + c
+                if self.board[r][c] != 0:
+                    self.hash ^= ZOBRIST_CLEARED[cell]
+                previous = self.territory_board[r][c]
+                if previous != owner:
+                    if previous != 0:
+                        self.hash ^= ZOBRIST_OWNER[previous][cell]
+                    self.hash ^= ZOBRIST_OWNER[owner][cell]
                 self.board[r][c] = 0  # 해당 칸 숫자는 사용했으므로 0 처리
-                self.territory_board[r][c] = 1 if is_my_turn else -1
+                self.territory_board[r][c] = owner
+        self._patch_prefix(r1, c1, r2, c2)
 
     def restoreMove(self, r1, c1, r2, c2, original_board, original_territory_board) -> None:
         # 이전 상태로 복구
@@ -139,6 +298,7 @@ class Game:
             for c in range(c1, c2 + 1):
                 self.board[r][c] = original_board[r][c]
                 self.territory_board[r][c] = original_territory_board[r][c]
+        self._patch_prefix(r1, c1, r2, c2)
 
 
 def main():
@@ -0,0 +1,295 @@
+"""
+로컬 대전 심판 (arena)
+
+봇 두 개를 프로세스로 띄워 READY/INIT/TIME/OPP/FINISH 프로토콜로 대전시킴
+- 10x17 보드를 시드로 생성
+- 수의 유효성(합 10, 네 변 포함)과 각자 남은 시간을 검사
+- 점령한 칸 수로 승패 판정
+- 여러 판을 프로세스 풀로 동시에 진행 (기본은 코어 수의 절반: 한 판에 봇 둘이 함께 코어를 씀)
+
+사용 예:
+    python arena.py 메인.py 1650점.py --games 20 --workers 4
+    python arena.py 메인.py ./main --time 10000 --seed 7 --json result.json
+"""
+
+import argparse
+import json
+import os
+import queue
+import random
+import shlex
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# 보드 크기 정의
+BOARD_ROW = 10
+BOARD_COLUMN = 17
+
+# 패스할 때 사용하는 무효 좌표
+PASS = (-1, -1, -1, -1)
+
+# 기본 제한 시간 (ms)
+DEFAULT_TIME_MS = 10000  # 한 판 동안 한 사람이 쓸 수 있는 전체 시간
+READY_TIMEOUT_MS = 3000  # READY -> OK 응답 제한 시간
+
+
+def generate_board(seed):
+    # 1 ~ 9 숫자로 채운 10x17 보드
+    rng = random.Random(seed)
+    return [[rng.randint(1, 9) for _ in range(BOARD_COLUMN)] for _ in range(BOARD_ROW)]
+
+
+def bot_command(spec):
+    # .py 파일은 현재 파이썬으로 실행, 그 외는 실행 파일(또는 명령어)로 취급
+    if spec.endswith(".py"):
+        return [sys.executable, spec]
+    return shlex.split(spec)
+
+
+def is_valid_move(board, r1, c1, r2, c2):
+    # 사각형 (r1, c1) ~ (r2, c2)이 유효한지 검사 (범위 안, 합이 10이고, 네 변을 모두 포함)
+    if not (0 <= r1 <= r2 < BOARD_ROW and 0 <= c1 <= c2 < BOARD_COLUMN):
+        return False
+    sums = 0
+    border_flags = 0
+    for r in range(r1, r2 + 1):
+        for c in range(c1, c2 + 1):
+            if board[r][c] != 0:
+                sums += board[r][c]
+                if r == r1: border_flags |= 1
+                if r == r2: border_flags |= 2
+                if c == c1: border_flags |= 4
+                if c == c2: border_flags |= 8
+    return sums == 10 and border_flags == 15
+
+
+class BotProcess:
+    """프로토콜로 통신하는 봇 프로세스 (응답은 별도 스레드가 읽어 큐에 넣음)"""
+
+    def __init__(self, spec, show_stderr=False):
+        self.spec = spec
+        self.process = subprocess.Popen(
+            bot_command(spec),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=None if show_stderr else subprocess.DEVNULL,
+            text=True,
+            encoding="utf-8",
+            bufsize=1,
+        )
+        self.lines = queue.Queue()
+        self.reader = threading.Thread(target=self._read_loop, daemon=True)
+        self.reader.start()
+
+    def _read_loop(self):
+        for line in self.process.stdout:
+            self.lines.put(line.strip())
+        self.lines.put(None)  # 프로세스 종료
+
+    def send(self, line):
+        try:
+            self.process.stdin.write(line + "\n")
+            self.process.stdin.flush()
+        except (BrokenPipeError, OSError):
+            pass
+
+    def receive(self, timeout_ms):
+        """
+        한 줄을 기다려 받음
+
+        Returns:
+            (받은 줄, 걸린 시간 ms), 시간 초과면 받은 줄이 None, 프로세스가 죽었으면 ""
+        """
+        start = time.perf_counter()
+        try:
+            line = self.lines.get(timeout=max(timeout_ms, 0) / 1000)
+        except queue.Empty:
+            line = None
+        else:
+            if line is None:
+                line = ""
+        elapsed = int((time.perf_counter() - start) * 1000)
+        return line, elapsed
+
+    def close(self):
+        self.send("FINISH")
+        try:
+            self.process.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+
+
+def play_game(spec_first, spec_second, seed, time_ms=DEFAULT_TIME_MS, show_stderr=False):
+    """
+    한 판 진행
+
+    Returns:
+        dict: 점수, 승자(0: 선공, 1: 후공, None: 무승부), 종료 사유, 수별 소요 시간
+    """
+    board = generate_board(seed)
+    owner = [[-1] * BOARD_COLUMN for _ in range(BOARD_ROW)]  # -1: 미점령, 0: 선공, 1: 후공
+    bots = [BotProcess(spec_first, show_stderr), BotProcess(spec_second, show_stderr)]
+    clocks = [time_ms, time_ms]
+    latencies = [[], []]
+    result = {"seed": seed, "bots": [spec_first, spec_second]}
+
+    def finish(reason, loser=None):
+        for bot in bots:
+            bot.close()
+        scores = [sum(row.count(p) for row in owner) for p in (0, 1)]
+        if loser is not None:
+            winner = 1 - loser
+        elif scores[0] != scores[1]:
+            winner = 0 if scores[0] > scores[1] else 1
+        else:
+            winner = None
+        result.update(scores=scores, winner=winner, reason=reason, latencies=latencies)
+        return result
+
+    # READY / INIT
+    for player, bot in enumerate(bots):
+        bot.send("READY " + ("FIRST" if player == 0 else "SECOND"))
+        line, _ = bot.receive(READY_TIMEOUT_MS)
+        if line != "OK":
+            return finish("no OK from bot %d" % player, loser=player)
+    init_line = "INIT " + " ".join("".join(map(str, row)) for row in board)
+    for bot in bots:
+        bot.send(init_line)
+
+    player = 0
+    passes = 0
+    while passes < 2:
+        bot, other = bots[player], bots[1 - player]
+        bot.send("TIME %d %d" % (clocks[player], clocks[1 - player]))
+        line, elapsed = bot.receive(clocks[player])
+        clocks[player] -= elapsed
+        if line is None or clocks[player] < 0:
+            return finish("bot %d timed out" % player, loser=player)
+        latencies[player].append(elapsed)
+
+        try:
+            move = tuple(map(int, line.split()))
+        except ValueError:
+            move = ()
+        if len(move) != 4:
+            return finish("bot %d sent malformed move %r" % (player, line), loser=player)
+
+        if move == PASS:
+            passes += 1
+        elif is_valid_move(board, *move):
+            passes = 0
+            r1, c1, r2, c2 = move
+            for r in range(r1, r2 + 1):
+                for c in range(c1, c2 + 1):
+                    board[r][c] = 0
+                    owner[r][c] = player
+        else:
+            return finish("bot %d sent invalid move %r" % (player, move), loser=player)
+
+        other.send("OPP %d %d %d %d %d" % (move + (elapsed,)))
+        player = 1 - player
+
+    return finish("both passed")
+
+
+def default_workers():
+    # 한 판에 봇 프로세스가 둘이고, 메인.py는 상대 차례에도 미리 탐색(PONDER)하므로 둘 다 코어를 씀
+    # 코어 수만큼 판을 돌리면 프로세스가 코어의 두 배가 되어 수별 시간이 부풀고 시간 초과 패가 생김
+    return max(1, (os.cpu_count() or 2) // 2)
+
+
+def _play_game_task(args):
+    # 프로세스 풀에서 호출하는 래퍼
+    return play_game(*args)
+
+
+def run_match(spec_a, spec_b, games, seed=0, time_ms=DEFAULT_TIME_MS, workers=None, show_stderr=False):
+    """
+    두 봇을 여러 판 대전 (판마다 선후공을 번갈아 바꿈)
+
+    Returns:
+        (판별 결과 목록, 요약 dict)
+    """
+    tasks = []
+    seats = []  # 판마다 (선공, 후공)이 A/B 중 누구인지 (같은 봇끼리 대전해도 구분되도록)
+    for i in range(games):
+        board_seed = seed + i // 2  # 같은 보드로 선후공을 바꿔 한 번씩
+        if i % 2 == 0:
+            tasks.append((spec_a, spec_b, board_seed, time_ms, show_stderr))
+            seats.append(("A", "B"))
+        else:
+            tasks.append((spec_b, spec_a, board_seed, time_ms, show_stderr))
+            seats.append(("B", "A"))
+
+    with ProcessPoolExecutor(max_workers=workers or default_workers()) as pool:
+        results = list(pool.map(_play_game_task, tasks))
+
+    summary = {
+        label: {"bot": spec, "wins": 0, "losses": 0, "draws": 0, "score": 0, "moves": []}
+        for label, spec in (("A", spec_a), ("B", spec_b))
+    }
+    for game, labels in zip(results, seats):
+        for seat, label in enumerate(labels):
+            stats = summary[label]
+            stats["score"] += game["scores"][seat]
+            stats["moves"].extend(game["latencies"][seat])
+            if game["winner"] is None:
+                stats["draws"] += 1
+            elif game["winner"] == seat:
+                stats["wins"] += 1
+            else:
+                stats["losses"] += 1
+
+    for stats in summary.values():
+        moves = sorted(stats.pop("moves"))
+        stats["avg_score"] = stats["score"] / games if games else 0
+        stats["avg_move_ms"] = sum(moves) / len(moves) if moves else 0
+        stats["p95_move_ms"] = moves[int(len(moves) * 0.95)] if moves else 0
+        stats["max_move_ms"] = moves[-1] if moves else 0
+    return results, summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="두 봇을 로컬에서 대전시키는 심판")
+    parser.add_argument("bot_a", help="봇 A (.py 파일 또는 실행 명령)")
+    parser.add_argument("bot_b", help="봇 B (.py 파일 또는 실행 명령)")
+    parser.add_argument("--games", type=int, default=2, help="대전 수 (짝수면 보드마다 선후공 한 번씩)")
+    parser.add_argument("--seed", type=int, default=0, help="보드 생성 시작 시드")
+    parser.add_argument("--time", type=int, default=DEFAULT_TIME_MS, help="한 사람의 전체 제한 시간 (ms)")
+    parser.add_argument(
+        "--workers", type=int, default=default_workers(),
+        help="동시에 진행할 판 수 (기본: 코어 수의 절반, 한 판에 봇 둘이 함께 돌기 때문)",
+    )
+    parser.add_argument("--stderr", action="store_true", help="봇의 stderr를 그대로 출력")
+    parser.add_argument("--json", help="판별 결과와 요약을 저장할 JSON 파일")
+    args = parser.parse_args()
+
+    results, summary = run_match(
+        args.bot_a, args.bot_b, args.games, args.seed, args.time, args.workers, args.stderr
+    )
+
+    for game in results:
+        print(
+            "seed %d: %s vs %s -> %d:%d (%s)"
+            % (game["seed"], game["bots"][0], game["bots"][1], game["scores"][0], game["scores"][1], game["reason"])
+        )
+    for label, stats in summary.items():
+        print(
+            "%s (%s): %dW %dL %dD, avg score %.1f, move avg %.0fms / p95 %dms / max %dms"
+            % (
+                label, stats["bot"], stats["wins"], stats["losses"], stats["draws"], stats["avg_score"],
+                stats["avg_move_ms"], stats["p95_move_ms"], stats["max_move_ms"],
+            )
+        )
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"games": results, "summary": summary}, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
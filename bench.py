@@ -0,0 +1,230 @@
+"""
+탐색 성능 벤치마크
+
+시드로 만든 보드 모음(초반 + 칸이 지워지고 땅이 섞인 중반 국면)에서
+각 봇의 calculateMove를 호출해 수마다 걸린 시간과 탐색량을 측정
+- move_ms: calculateMove 소요 시간 (모든 봇)
+- nodes, nodes_per_sec: 탐색 노드 수 (game.nodes를 세는 봇만: 메인.py)
+- isvalid_calls, isvalid_per_sec: isValid 호출 수 (isValid로 수를 고르는 봇만: 1300점.py, temp.py 등
+  메인.py는 유효 사각형 집합을 수마다 갱신해 탐색 중 isValid를 부르지 않으므로 "-")
+- depth: 끝까지 마친 탐색 깊이 (game.last_depth를 남기는 봇만: 메인.py)
+- playouts_per_sec: MCTS 초당 플레이아웃 수 (game.playouts를 세는 봇만: 메인.py, ENGINE = "mcts"일 때)
+해당하지 않는 값은 JSON에 null, 표에 "-"로 남김
+
+사용 예:
+    python bench.py
+    python bench.py --bots 메인.py 1300점.py --boards 8 --plies 0 10 20 30 --json bench.json
+"""
+
+import argparse
+import copy
+import importlib.util
+import json
+import os
+import platform
+import random
+import subprocess
+import time
+
+from arena import BOARD_COLUMN, BOARD_ROW, DEFAULT_TIME_MS, generate_board, is_valid_move
+
+DEFAULT_BOTS = ["메인.py", "1300점.py"]
+DEFAULT_PLIES = [0, 10, 20, 30]
+
+
+def load_bot(path):
+    # 파일 경로로 봇 모듈을 불러옴 (파일 이름이 한글이라 import 문 대신 사용)
+    name = "bench_" + os.path.splitext(os.path.basename(path))[0]
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def valid_moves(board):
+    return [
+        (r1, c1, r2, c2)
+        for r1 in range(BOARD_ROW)
+        for r2 in range(r1, BOARD_ROW)
+        for c1 in range(BOARD_COLUMN)
+        for c2 in range(c1, BOARD_COLUMN)
+        if is_valid_move(board, r1, c1, r2, c2)
+    ]
+
+
+def build_corpus(seed, boards, plies):
+    """
+    벤치마크 국면 목록 생성
+    보드마다 무작위 유효 수를 번갈아 두어 지정한 수(ply)만큼 진행한 국면을 만듦
+
+    Returns:
+        [{"board_seed", "ply", "board", "moves": [(수, 내 수 여부), ...]}, ...]
+    """
+    corpus = []
+    for board_seed in range(seed, seed + boards):
+        board = generate_board(board_seed)
+        rng = random.Random(board_seed)
+        current = copy.deepcopy(board)
+        moves = []
+        for ply in range(max(plies) + 1):
+            if ply in plies:
+                corpus.append({"board_seed": board_seed, "ply": ply, "board": board, "moves": list(moves)})
+            candidates = valid_moves(current)
+            if not candidates:
+                break
+            move = rng.choice(candidates)
+            r1, c1, r2, c2 = move
+            for r in range(r1, r2 + 1):
+                for c in range(c1, c2 + 1):
+                    current[r][c] = 0
+            # 짝수 번째 수는 벤치마크 대상(선공), 홀수 번째는 상대
+            moves.append((move, ply % 2 == 0))
+    return corpus
+
+
+def setup_game(module, position):
+    # 국면까지 수를 재생한 Game 생성 (각 봇의 updateMove/updateOpponentAction 사용)
+    game = module.Game(copy.deepcopy(position["board"]), True)
+    for move, is_mine in position["moves"]:
+        if is_mine:
+            game.updateMove(*move, True)
+        else:
+            game.updateOpponentAction(move, 0)
+    # 내 수 차례 수(turn)를 세는 봇은 calculateMove에서만 늘리므로, 재생한 내 수만큼 직접 진행
+    # (그러지 않으면 1300점.py/temp.py는 중반 국면에서도 초반 전략(turn <= 4)만 측정됨)
+    if hasattr(game, "turn"):
+        game.turn += sum(1 for _, is_mine in position["moves"] if is_mine)
+    return game
+
+
+def bench_position(module, position, time_ms):
+    game = setup_game(module, position)
+
+    # isValid 호출 수 세기 (측정하는 동안만 클래스 메서드를 감쌈, __slots__를 쓰는 봇도 있어 인스턴스에는 못 붙임)
+    calls = [0]
+    cls = type(game)
+    is_valid = cls.isValid
+
+    def counting_is_valid(self, *args):
+        calls[0] += 1
+        return is_valid(self, *args)
+
+    cls.isValid = counting_is_valid
+    try:
+        start = time.perf_counter()
+        move = game.calculateMove(time_ms, time_ms)
+        elapsed = time.perf_counter() - start
+    finally:
+        cls.isValid = is_valid
+
+    nodes = getattr(game, "nodes", None)
+    playouts = getattr(game, "playouts", None)
+    return {
+        "board_seed": position["board_seed"],
+        "ply": position["ply"],
+        "move": list(move),
+        "move_ms": elapsed * 1000,
+        "nodes": nodes,
+        "nodes_per_sec": nodes / elapsed if nodes is not None and elapsed > 0 else None,
+        "isvalid_calls": calls[0],
+        "isvalid_per_sec": calls[0] / elapsed if elapsed > 0 else None,
+        "depth": getattr(game, "last_depth", None),
+        "playouts": playouts,
+        "playouts_per_sec": playouts / elapsed if playouts and elapsed > 0 else None,
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_bench(bots, seed, boards, plies, time_ms):
+    corpus = build_corpus(seed, boards, plies)
+    results = {}
+    for path in bots:
+        module = load_bot(path)
+        records = [bench_position(module, position, time_ms) for position in corpus]
+        # 어느 국면에서도 isValid를 부르지 않은 봇은 isValid로 수를 고르지 않는 봇이므로 null로 표시
+        # (isValid를 쓰는 봇이 어떤 국면에서만 0번 부른 것은 실제 측정값이라 그대로 둠)
+        if not any(record["isvalid_calls"] for record in records):
+            for record in records:
+                record["isvalid_calls"] = record["isvalid_per_sec"] = None
+        results[path] = records
+    return results
+
+
+def summarize(records):
+    # 수(ply)별 평균
+    by_ply = {}
+    for record in records:
+        by_ply.setdefault(record["ply"], []).append(record)
+    summary = {}
+    for ply, group in sorted(by_ply.items()):
+        nodes = [r["nodes"] for r in group if r["nodes"] is not None]
+        depths = [r["depth"] for r in group if r["depth"] is not None]
+        playouts = [r["playouts"] for r in group if r["playouts"]]
+        isvalid = [r["isvalid_calls"] for r in group if r["isvalid_calls"] is not None]
+        total_sec = sum(r["move_ms"] for r in group) / 1000
+        summary[ply] = {
+            "positions": len(group),
+            "avg_move_ms": sum(r["move_ms"] for r in group) / len(group),
+            "max_move_ms": max(r["move_ms"] for r in group),
+            "avg_nodes": sum(nodes) / len(nodes) if nodes else None,
+            "avg_depth": sum(depths) / len(depths) if depths else None,
+            "nodes_per_sec": sum(nodes) / total_sec if nodes and total_sec > 0 else None,
+            "isvalid_per_sec": sum(isvalid) / total_sec if isvalid and total_sec > 0 else None,
+            "playouts_per_sec": sum(playouts) / total_sec if playouts and total_sec > 0 else None,
+        }
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="봇 탐색 성능 벤치마크")
+    parser.add_argument("--bots", nargs="+", default=DEFAULT_BOTS, help="측정할 봇 파일")
+    parser.add_argument("--seed", type=int, default=0, help="보드 생성 시작 시드")
+    parser.add_argument("--boards", type=int, default=4, help="보드 수")
+    parser.add_argument("--plies", type=int, nargs="+", default=DEFAULT_PLIES, help="측정할 국면 (진행한 수)")
+    parser.add_argument("--time", type=int, default=DEFAULT_TIME_MS, help="calculateMove에 넘길 남은 시간 (ms)")
+    parser.add_argument("--json", help="결과를 저장할 JSON 파일")
+    args = parser.parse_args()
+
+    results = run_bench(args.bots, args.seed, args.boards, sorted(set(args.plies)), args.time)
+
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "git": git_revision(),
+        "python": platform.python_version(),
+        "params": {"seed": args.seed, "boards": args.boards, "plies": args.plies, "time_ms": args.time},
+        "bots": {},
+    }
+    for path, records in results.items():
+        summary = summarize(records)
+        report["bots"][path] = {"summary": summary, "positions": records}
+
+        print(path)
+        for ply, row in summary.items():
+            print(
+                "  ply %3d: move avg %8.1fms max %8.1fms | depth %s | nodes %s | nodes/s %s | isValid/s %s"
+                " | playouts/s %s"
+                % (
+                    ply, row["avg_move_ms"], row["max_move_ms"],
+                    "-" if row["avg_depth"] is None else "%.1f" % row["avg_depth"],
+                    "-" if row["avg_nodes"] is None else "%.0f" % row["avg_nodes"],
+                    "-" if row["nodes_per_sec"] is None else "%.0f" % row["nodes_per_sec"],
+                    "-" if row["isvalid_per_sec"] is None else "%.0f" % row["isvalid_per_sec"],
+                    "-" if row["playouts_per_sec"] is None else "%.0f" % row["playouts_per_sec"],
+                )
+            )
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,20 @@
+import heapq
+import json
 import math
-from copy import deepcopy
+import mmap
+import multiprocessing
+import os
+import queue
+import random
+import struct
+import sys
+import threading
+import time
+
+try:
+    import numpy as np
+except ImportError:  # NumPy가 없는 환경에서는 순수 파이썬 경로 사용
+    np = None
 
 """
 주의사항: print() 함수 사용 시, 반드시 flush=True 설정할 것!
@@ -7,8 +22,39 @@ from copy import deepcopy
         그렇지 않으면 TLE(Time Limit Exceeded)가 발생할 수 있음.
 """
 
-# 게임 트리 탐색 최대 깊이
-DEPTH = 2
+# 게임 트리 탐색 최대 깊이 (반복 심화는 1부터 시작해 시간이 남는 동안 이 깊이까지 늘림)
+DEPTH = 100
+
+# 수 계산 방식: "negamax" (알파베타 반복 심화) 또는 "mcts" (UCT 몬테카를로 트리 탐색)
+ENGINE = "negamax"
+
+# MCTS 설정
+MCTS_POLICY = "greedy"  # 플레이아웃 정책: "greedy" (바뀌는 점수가 가장 큰 수) 또는 "random"
+MCTS_C = 1.4  # UCT 탐험 상수
+MCTS_PLAYOUT_PLIES = 12  # 플레이아웃 최대 수 (끝나지 않으면 그때의 평가값으로 판정)
+MCTS_SCORE_SCALE = 8  # 평가값 -> 보상 변환: tanh(평가값 / 이 값), 범위 -1 ~ 1
+
+# 평가 가중치 (평가값 = 내 땅 가치 합 - 상대 땅 가치 합, applyMove/undoMove가 누적 갱신)
+OWN_WEIGHT = 1  # 땅 한 칸의 기본 가치
+CELL_WEIGHTS = None  # 칸별 추가 가치 (길이 170 목록, r * BOARD_COLUMN + c 순서), None이면 사용 안 함
+# 상대 땅을 빼앗을 때마다 더하는 점수 (temp2.py의 탈환 가중치에 해당)
+# 국면이 아니라 수순에 따라 값이 달라지므로, 0이 아니면 치환표 값이 근사치가 됨
+STEAL_WEIGHT = 0
+# 둔 뒤 상대가 그 칸을 하나도 다시 빼앗을 수 없는 "안전한 수"에 더하는 점수 (temp2.py의 안전 가중치에 해당)
+# STEAL_WEIGHT와 마찬가지로 수순에 따른 점수라 기본값은 0
+SAFE_WEIGHT = 0
+
+# 시간 관리 (TIME 명령으로 받는 남은 시간은 ms 단위)
+TIME_MARGIN_MS = 300  # 입출력/인터프리터 지연 대비 여유 시간
+MIN_MOVES_LEFT = 8  # 남은 내 수 추정값의 하한 (초반에 시간을 몰아 쓰지 않도록)
+TIME_CHECK_INTERVAL = 8  # 노드 몇 개마다 시계를 확인할지 (2의 거듭제곱, 노드 하나가 0.5ms 안팎이라 작게)
+# 상대 차례 동안 상대 입장에서 미리 탐색 (결과는 치환표에 남아 다음 calculateMove에서 재사용)
+PONDER = True
+
+# 루트 분할 병렬 탐색 (GIL 때문에 한 프로세스로는 코어 하나만 쓰므로 프로세스 풀 사용)
+# 루트의 유효 사각형을 워커 수만큼 나눠 각 워커가 자기 몫의 하위 트리를 탐색
+WORKERS = 0  # 워커 프로세스 수, 0 또는 1이면 사용 안 함 (한 프로세스에서 탐색)
+WORKER_GRACE_MS = 50  # 마감 시각 뒤 워커 결과를 더 기다리는 시간
 
 # 보드 크기 정의
 BOARD_ROW = 10 # (0,0) ~ (9,0)
@@ -17,45 +63,688 @@ BOARD_COLUMN = 17 # (0,0) ~ (0,16)
 # 패스할 때 사용하는 무효 좌표
 PASS = [-1, -1, -1, -1]
 
+# 모든 사각형 목록 (r1 -> r2 -> c1 -> c2 순서, 인덱스가 곧 사각형 id)
+# id = ROW_PAIR[r1][r2] * len(COL_PAIRS) + COL_PAIR[c1][c2]
+ROW_PAIRS = [(r1, r2) for r1 in range(BOARD_ROW) for r2 in range(r1, BOARD_ROW)]
+COL_PAIRS = [(c1, c2) for c1 in range(BOARD_COLUMN) for c2 in range(c1, BOARD_COLUMN)]
+ROW_PAIR = [[0] * BOARD_ROW for _ in range(BOARD_ROW)]
+COL_PAIR = [[0] * BOARD_COLUMN for _ in range(BOARD_COLUMN)]
+for _i, (_a, _b) in enumerate(ROW_PAIRS):
+    ROW_PAIR[_a][_b] = _i
+for _i, (_a, _b) in enumerate(COL_PAIRS):
+    COL_PAIR[_a][_b] = _i
+RECTS = [(r1, c1, r2, c2) for r1, r2 in ROW_PAIRS for c1, c2 in COL_PAIRS]
+
+# 비트보드: (r, c) 칸은 r * BOARD_COLUMN + c 번째 비트 (170칸 -> 파이썬 int 하나)
+ALL_CELLS = (1 << (BOARD_ROW * BOARD_COLUMN)) - 1
+
+
+def _rect_mask(r1, c1, r2, c2):
+    # (r1, c1) ~ (r2, c2)가 덮는 칸의 비트마스크
+    line = ((1 << (c2 - c1 + 1)) - 1) << c1
+    mask = 0
+    for r in range(r1, r2 + 1):
+        mask |= line << (r * BOARD_COLUMN)
+    return mask
+
+
+# 사각형 기하 정보 파일 (data.bin): 사각형마다 id, 네 꼭짓점, 면적, 덮는 칸 마스크, 네 변(위/아래/왼/오른) 마스크
+# 처음 한 번 만들어 두고 이후에는 mmap으로 읽기만 함 (없거나 형식이 다르면 다시 만듦)
+GEOMETRY_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data.bin")
+GEOMETRY_MAGIC = b"NYPCGEOM"
+GEOMETRY_VERSION = 1
+GEOMETRY_HEADER = struct.Struct("<8sHHHHI")  # magic, 버전, 행 수, 열 수, 마스크 바이트 수, 사각형 수
+MASK_BYTES = (BOARD_ROW * BOARD_COLUMN + 7) // 8
+GEOMETRY_RECORD = struct.Struct("<H4BH" + "%ds" % MASK_BYTES * 5)  # id, r1, c1, r2, c2, 면적, 마스크 5개
+
+
+def _build_geometry():
+    # (칸 마스크, (위, 아래, 왼, 오른) 변 마스크) 목록을 직접 계산
+    masks, borders = [], []
+    for r1, c1, r2, c2 in RECTS:
+        masks.append(_rect_mask(r1, c1, r2, c2))
+        borders.append(
+            (
+                _rect_mask(r1, c1, r1, c2),
+                _rect_mask(r2, c1, r2, c2),
+                _rect_mask(r1, c1, r2, c1),
+                _rect_mask(r1, c2, r2, c2),
+            )
+        )
+    return masks, borders
+
+
+def _write_geometry(path, masks, borders):
+    header = GEOMETRY_HEADER.pack(
+        GEOMETRY_MAGIC, GEOMETRY_VERSION, BOARD_ROW, BOARD_COLUMN, MASK_BYTES, len(RECTS)
+    )
+    chunks = [header]
+    for move_id, (r1, c1, r2, c2) in enumerate(RECTS):
+        packed = [mask.to_bytes(MASK_BYTES, "little") for mask in (masks[move_id],) + borders[move_id]]
+        area = (r2 - r1 + 1) * (c2 - c1 + 1)
+        chunks.append(GEOMETRY_RECORD.pack(move_id, r1, c1, r2, c2, area, *packed))
+    # 다른 프로세스가 반쯤 쓴 파일을 읽지 않도록 임시 파일에 쓴 뒤 교체
+    temp = "%s.%d.tmp" % (path, os.getpid())
+    with open(temp, "wb") as f:
+        f.write(b"".join(chunks))
+    os.replace(temp, path)
+
+
+def _read_geometry(path):
+    """
+    data.bin을 mmap으로 열어 기하 정보를 읽음
+
+    Returns:
+        (칸 마스크 목록, 변 마스크 목록), 파일이 없거나 형식이 맞지 않으면 None
+    """
+    try:
+        with open(path, "rb") as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):  # 빈 파일은 mmap할 수 없음 (ValueError)
+        return None
+    with data:
+        expected = GEOMETRY_HEADER.pack(
+            GEOMETRY_MAGIC, GEOMETRY_VERSION, BOARD_ROW, BOARD_COLUMN, MASK_BYTES, len(RECTS)
+        )
+        if data.size() != GEOMETRY_HEADER.size + GEOMETRY_RECORD.size * len(RECTS):
+            return None
+        if data[: GEOMETRY_HEADER.size] != expected:
+            return None
+        masks, borders = [], []
+        from_bytes = int.from_bytes
+        for _, _, _, _, _, _, cells, top, bottom, left, right in GEOMETRY_RECORD.iter_unpack(
+            data[GEOMETRY_HEADER.size:]
+        ):
+            masks.append(from_bytes(cells, "little"))
+            borders.append(
+                (
+                    from_bytes(top, "little"),
+                    from_bytes(bottom, "little"),
+                    from_bytes(left, "little"),
+                    from_bytes(right, "little"),
+                )
+            )
+    return masks, borders
+
+
+def _load_geometry():
+    geometry = _read_geometry(GEOMETRY_FILE)
+    if geometry is None:
+        geometry = _build_geometry()
+        try:
+            _write_geometry(GEOMETRY_FILE, *geometry)
+        except OSError:  # 쓸 수 없는 위치면 이번 실행은 계산한 값만 사용
+            pass
+    return geometry
+
+
+# RECT_MASKS[id]: 사각형이 덮는 칸, RECT_BORDERS[id]: (위, 아래, 왼, 오른) 변의 칸
+RECT_MASKS, RECT_BORDERS = _load_geometry()
+
+if np is not None:
+    # 사각형 전체를 (행 쌍, 열 쌍) 2차원 배열로 한 번에 계산하기 위한 좌표 배열
+    # 2차원 배열을 펼친 인덱스가 곧 사각형 id
+    PAIR_R1 = np.array([r1 for r1, _ in ROW_PAIRS])
+    PAIR_R2 = np.array([r2 for _, r2 in ROW_PAIRS])
+    PAIR_C1 = np.array([c1 for c1, _ in COL_PAIRS])
+    PAIR_C2 = np.array([c2 for _, c2 in COL_PAIRS])
+
+
+def rect_id(r1, c1, r2, c2):
+    # 좌표로 사각형 id 계산
+    return ROW_PAIR[r1][r2] * len(COL_PAIRS) + COL_PAIR[c1][c2]
+
+
+def rect_in_region(move_id, region):
+    # 사각형이 영역 (r_start, r_end, c_start, c_end) 안(끝은 제외)에 완전히 들어가는지, 영역이 None이면 항상 참
+    if region is None:
+        return True
+    r1, c1, r2, c2 = RECTS[move_id]
+    r_start, r_end, c_start, c_end = region
+    return r_start <= r1 and r2 < r_end and c_start <= c1 and c2 < c_end
+
+
+# Zobrist 해시 키 (칸마다: 숫자가 지워짐 / 내 땅 / 상대 땅), 실행마다 같은 값이 나오도록 시드 고정
+_zobrist_rng = random.Random(20250805)
+ZOBRIST_CLEARED = [_zobrist_rng.getrandbits(64) for _ in range(BOARD_ROW * BOARD_COLUMN)]
+ZOBRIST_MINE = [_zobrist_rng.getrandbits(64) for _ in range(BOARD_ROW * BOARD_COLUMN)]
+ZOBRIST_OPP = [_zobrist_rng.getrandbits(64) for _ in range(BOARD_ROW * BOARD_COLUMN)]
+ZOBRIST_OPP_TO_MOVE = _zobrist_rng.getrandbits(64)  # 상대 차례인 국면 구분용
+
+
+def _weighted_sum(bits, weights):
+    # bits에 켜진 칸들의 가중치 합
+    total = 0
+    while bits:
+        low = bits & -bits
+        total += weights[low.bit_length() - 1]
+        bits ^= low
+    return total
+
+
+def _zobrist_xor(bits, keys):
+    # bits에 켜진 칸들의 키를 모두 XOR
+    h = 0
+    while bits:
+        low = bits & -bits
+        h ^= keys[low.bit_length() - 1]
+        bits ^= low
+    return h
+
+
+# 탐색 계측 (환경 변수 NYPC_TRACE로 켬, 꺼져 있으면 탐색 비용 없음)
+# "1" 또는 "stderr"면 stderr에, 그 외 값은 그 경로의 파일에 턴마다 JSON 한 줄씩 기록
+# stdout은 프로토콜 전용이므로 계측 내용을 쓰지 않음
+TRACE = os.environ.get("NYPC_TRACE", "")
+
+
+# 수 정렬 우선순위 (클수록 먼저 탐색)
+ORDER_HASH = 1 << 62  # 치환표/직전 반복의 최적 수
+ORDER_STEAL = 1 << 61  # 상대 땅을 빼앗는 수 (+ 얻는 칸 수)
+ORDER_KILLER = 1 << 60  # 같은 깊이에서 beta 컷을 냈던 수
+KILLER_SLOTS = 2  # 깊이마다 기억할 킬러 수 개수
+
+# 치환표 항목의 값 종류
+TT_EXACT = 0
+TT_LOWER = 1  # 실제 값 >= value (beta 컷)
+TT_UPPER = 2  # 실제 값 <= value (alpha 이하)
+
+# 치환표 버킷 수 (2의 거듭제곱), 버킷당 2칸이라 항목은 최대 2배
+TT_BUCKETS = 1 << 17
+
+# 종반 완전 탐색: 유효 사각형이 이 개수 이하이면 패스까지 포함해 게임 끝까지 정확히 풂
+# 수를 둘 때마다 새 사각형이 생겨 풀이 시간은 편차가 큼 (4개: 보통 수십 ms, 6개: 수백 ms ~ 수 초)
+ENDGAME_MOVES = 4
+ENDGAME_BUDGET = 0.25  # 풀이에 쓰는 시간 비율, 못 풀면 남은 시간으로 반복 심화
+
+
+class SearchTimeout(Exception):
+    """탐색 마감 시간이 지나 현재 반복을 중단할 때 사용"""
+
+
+class SearchStats:
+    """한 번의 calculateMove 동안 모은 탐색 계측 값 (NYPC_TRACE가 켜졌을 때만 사용)"""
+
+    def __init__(self):
+        self.nodes = [0] * (DEPTH + 1)  # 깊이(ply)별 방문 노드 수
+        self.cutoffs = 0  # beta 컷 횟수
+        self.cutoff_order = {}  # 컷을 낸 수가 정렬 순서상 몇 번째였는지 -> 횟수
+        self.tt_probes = 0
+        self.tt_hits = 0
+        self.movegen_time = 0.0  # 수 정렬 + 적용/되돌리기(유효 사각형 갱신 포함) 시간
+        self.eval_time = 0.0  # 평가 함수 시간
+        self.root_ply = 0  # 이번 탐색을 시작할 때의 undo_stack 길이 (종반 풀이의 깊이 계산용)
+        self.pv = []  # MCTS처럼 치환표로 수순을 복원할 수 없는 탐색이 남기는 예상 수순
+
+    def report(self, game, engine, depth, budget_ms, elapsed_ms, pv):
+        # 턴 요약을 JSON 한 줄로 stderr 또는 파일에 기록
+        # engine: "negamax" (반복 심화), "endgame" (종반 완전 탐색), "mcts" (nodes = 플레이아웃, 깊이 = 트리 깊이)
+        last = max((i for i, n in enumerate(self.nodes) if n), default=0)
+        line = json.dumps(
+            {
+                "turn": game.turn,
+                "engine": engine,
+                "depth": depth,
+                "budget_ms": round(budget_ms, 1),
+                "elapsed_ms": round(elapsed_ms, 1),
+                "nodes": sum(self.nodes),
+                "nodes_per_depth": self.nodes[: last + 1],
+                "cutoffs": self.cutoffs,
+                "cutoff_order": dict(sorted(self.cutoff_order.items())),
+                "tt_hit_rate": round(self.tt_hits / self.tt_probes, 3) if self.tt_probes else None,
+                "movegen_ms": round(self.movegen_time * 1000, 1),
+                "eval_ms": round(self.eval_time * 1000, 1),
+                "pv": pv,
+            }
+        )
+        if TRACE in ("1", "stderr"):
+            print(line, file=sys.stderr, flush=True)
+        else:
+            with open(TRACE, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+
+class MCTSNode:
+    """
+    MCTS 트리 노드
+    total은 이 노드로 오는 수를 둔 쪽 입장의 보상 합
+    """
+
+    def __init__(self, parent, move_id, color, untried):
+        self.parent = parent
+        self.move_id = move_id  # 부모에서 이 노드로 오는 수 (루트는 -1)
+        self.color = color  # 이 노드에서 둘 차례 (1: 나, -1: 상대)
+        self.untried = untried  # 아직 자식으로 만들지 않은 수 (pop()하면 유망한 수부터)
+        self.children = []
+        self.visits = 0
+        self.total = 0.0
+
+    def select_child(self):
+        # UCT 값이 가장 큰 자식
+        log_visits = math.log(self.visits)
+        return max(
+            self.children,
+            key=lambda child: child.total / child.visits + MCTS_C * math.sqrt(log_visits / child.visits),
+        )
+
+
+class RectangleQueue:
+    """
+    유효 사각형 우선순위 큐 (heapq, 지연 삭제)
+    실제로 수를 둘 때(updateMove) 점수가 바뀌었을 수 있는 사각형만 다시 넣고,
+    무효가 되었거나 점수가 달라진 항목은 꺼낼 때 버리거나 새 점수로 다시 넣음
+    영역을 주면 그 안에 완전히 들어가는 사각형만 담으므로, 꺼낼 때 영역 밖 항목을 건너뛸 일이 없음
+    """
+
+    def __init__(self, game, key, dynamic, region=None):
+        self.game = game
+        self.key = key  # 사각형 id -> 점수 (클수록 먼저)
+        self.dynamic = dynamic  # 점수가 땅 상태에 따라 바뀌는지 (면적은 안 바뀜)
+        self.region = region  # (r_start, r_end, c_start, c_end), 끝은 제외
+        self.heap = [(-key(move_id), move_id) for move_id in game.legal_moves if rect_in_region(move_id, region)]
+        heapq.heapify(self.heap)
+
+    def update(self, move_ids):
+        # 새로 유효해졌거나 점수가 바뀌었을 수 있는 사각형을 현재 점수로 넣음 (옛 항목은 꺼낼 때 정리)
+        legal_moves = self.game.legal_moves
+        for move_id in move_ids:
+            if move_id in legal_moves and rect_in_region(move_id, self.region):
+                heapq.heappush(self.heap, (-self.key(move_id), move_id))
+
+    def top(self, k=1):
+        """
+        점수가 큰 유효 사각형 k개 (큐에서 빼지 않음)
+
+        Returns:
+            사각형 id 목록 (점수 내림차순)
+        """
+        heap = self.heap
+        legal_moves = self.game.legal_moves
+        found = []
+        seen = set()
+        while heap and len(found) < k:
+            entry = heapq.heappop(heap)
+            move_id = entry[1]
+            if move_id not in legal_moves or move_id in seen:
+                continue  # 무효가 됐거나 중복인 항목은 버림
+            score = self.key(move_id)
+            if -entry[0] != score:
+                heapq.heappush(heap, (-score, move_id))
+                continue
+            seen.add(move_id)
+            found.append(entry)
+        for entry in found:
+            heapq.heappush(heap, entry)
+        return [move_id for _, move_id in found]
+
+
+class TranspositionTable:
+    """
+    크기가 고정된 치환표
+    버킷마다 깊이 우선 칸(depth-preferred)과 항상 교체 칸(always-replace)을 둠
+    항목: (key, depth, flag, value, move_id)
+    """
+
+    def __init__(self, buckets=TT_BUCKETS):
+        self.mask = buckets - 1
+        self.deep = [None] * buckets
+        self.recent = [None] * buckets
+
+    def probe(self, key):
+        index = key & self.mask
+        entry = self.deep[index]
+        if entry is not None and entry[0] == key:
+            return entry
+        entry = self.recent[index]
+        if entry is not None and entry[0] == key:
+            return entry
+        return None
+
+    def store(self, key, depth, flag, value, move_id):
+        index = key & self.mask
+        entry = (key, depth, flag, value, move_id)
+        old = self.deep[index]
+        # 더 깊게 탐색한 결과(또는 같은 국면)는 깊이 우선 칸, 나머지는 항상 교체 칸
+        if old is None or old[0] == key or depth >= old[1]:
+            self.deep[index] = entry
+        else:
+            self.recent[index] = entry
+
 
 class Game:
+    # 인스턴스마다 __dict__를 두지 않음 (속성 접근이 빠르고 메모리가 적음)
+    __slots__ = (
+        "cells", "initial_cells", "digit_bits", "my_bits", "opp_bits", "score", "hash", "tt",
+        "endgame_memo", "turn", "max_depth", "deadline", "nodes", "hit_horizon", "last_depth",
+        "last_budget_ms", "last_elapsed_ms", "playouts", "last_playouts_per_sec", "ponder_thread",
+        "played", "pool", "shared_alpha", "queues", "killers", "history", "stats",
+        "sum_table", "count_table", "row_count", "col_count", "legal_moves", "threat", "undo_stack",
+    )
+
     def __init__(self, board, first):
-        # 보드 상태 저장
-        self.board = board
-        # 점령 여부 저장용 보드 (1: 내 땅, -1: 상대 땅, 0: 미점령)
-        self.territory_board = [
-            [0 for _ in range(BOARD_COLUMN)] for _ in range(BOARD_ROW)
-        ]
+        # 보드 상태 저장: 170칸 숫자를 r * BOARD_COLUMN + c 순서로 한 줄에 (칸당 1바이트)
+        self.cells = bytearray(value for row in board for value in row)
+        # 처음 숫자 (지워진 칸을 되돌릴 때 사용)
+        self.initial_cells = bytes(self.cells)
+
+        # 비트보드 상태
+        # digit_bits: 숫자가 남아 있는 칸, my_bits: 내 땅, opp_bits: 상대 땅
+        self.digit_bits = 0
+        for i, value in enumerate(self.cells):
+            if value != 0:
+                self.digit_bits |= 1 << i
+        self.my_bits = 0
+        self.opp_bits = 0
+        # 누적 평가값 (내 입장), 땅이 바뀔 때마다 바뀐 칸의 가치만큼 갱신
+        self.score = 0
+        # 현재 국면의 Zobrist 해시 (applyMove/undoMove가 갱신)
+        self.hash = _zobrist_xor(ALL_CELLS & ~self.digit_bits, ZOBRIST_CLEARED)
+        self.tt = TranspositionTable()
+        # 종반 완전 탐색 결과 {(해시, 직전 수가 패스였는지): (값 종류, 값, 최적 수 id)}
+        # 국면이 같으면 값도 같으므로 턴이 바뀌어도 계속 씀
+        self.endgame_memo = {}
         self.turn = 0
+
+        # 탐색 상태 (calculateMove가 설정)
+        self.max_depth = 1  # 현재 반복 심화 단계의 깊이
+        self.deadline = math.inf  # time.perf_counter() 기준 마감 시각
+        self.nodes = 0  # 이번 탐색에서 방문한 노드 수
+        self.hit_horizon = False  # 이번 반복에서 깊이 제한에 걸린 노드가 있었는지
+        self.last_depth = 0  # 직전 calculateMove에서 끝까지 마친 깊이
+        self.last_budget_ms = 0  # 직전 calculateMove에 배정한 시간
+        self.last_elapsed_ms = 0  # 직전 calculateMove에 실제로 쓴 시간
+        self.playouts = 0  # 직전 MCTS 탐색의 플레이아웃 수
+        self.last_playouts_per_sec = 0  # 직전 MCTS 탐색의 초당 플레이아웃 수
+        self.ponder_thread = None  # 상대 차례 동안 돌고 있는 미리 탐색 스레드
+
+        # 실제로 둔 수 목록 [(r1, c1, r2, c2, 내 수 여부), ...] (워커의 Game을 맞출 때 보냄)
+        self.played = []
+        # 루트 분할 병렬 탐색용 프로세스 풀과 워커끼리 공유하는 루트 alpha (start_workers가 설정)
+        self.pool = None
+        self.shared_alpha = None
+
+        # 상위 k개 사각형 질의용 우선순위 큐 {(점수 이름, 영역): RectangleQueue} (best_rectangles가 만듦)
+        self.queues = {}
+
+        # 수 정렬용 정보: 깊이(ply)별 킬러 수, 사각형 id별 history 점수
+        self.killers = [[-1] * KILLER_SLOTS for _ in range(DEPTH + 1)]
+        self.history = [0] * len(RECTS)
+
+        # 탐색 계측 (꺼져 있으면 None으로 두어 탐색 중 확인 비용만 남김)
+        self.stats = None
         # self.first = first (필요시 활성화)
 
-        # 사각형 (r1, c1) ~ (r2, c2)이 유효한지 검사 (합이 10이고, 네 변을 모두 포함)
+        # 누적합 테이블 (isValid를 O(1)로 만들기 위함)
+        # sum_table[r][c]: (0,0) ~ (r-1,c-1) 구간의 숫자 합
+        # count_table[r][c]: (0,0) ~ (r-1,c-1) 구간에서 숫자가 남은 칸 수
+        # row_count[r][c]: r행의 0 ~ c-1열 중 숫자가 남은 칸 수
+        # col_count[c][r]: c열의 0 ~ r-1행 중 숫자가 남은 칸 수
+        self.sum_table = [[0] * (BOARD_COLUMN + 1) for _ in range(BOARD_ROW + 1)]
+        self.count_table = [[0] * (BOARD_COLUMN + 1) for _ in range(BOARD_ROW + 1)]
+        self.row_count = [[0] * (BOARD_COLUMN + 1) for _ in range(BOARD_ROW)]
+        self.col_count = [[0] * (BOARD_ROW + 1) for _ in range(BOARD_COLUMN)]
+        self._patch_prefix(0, 0, BOARD_ROW - 1, BOARD_COLUMN - 1)
+
+        # 현재 둘 수 있는 사각형 id 집합
+        # 지우는 숫자가 같은 유효 사각형은 하나뿐이므로 숫자 집합으로 묶어 줄일 것은 없음:
+        # 네 변에 모두 숫자가 있어야 하니 유효 사각형은 곧 지우는 숫자들을 감싸는 최소 사각형이고,
+        # 빈 칸(0)으로 넓히면 넓힌 쪽 변에 숫자가 없어 무효가 됨
+        ids = self._enumerate_valid_rectangles()
+        self.legal_moves = set(ids)
+        # 위협 지도: 칸마다 그 칸을 덮는 유효 사각형 수 (r * BOARD_COLUMN + c 순서)
+        self.threat = [0] * (BOARD_ROW * BOARD_COLUMN)
+        for move_id in self.legal_moves:
+            self._cover(move_id, 1)
+        # 수를 되돌리기 위한 기록 (applyMove가 쌓고 undoMove가 꺼냄)
+        self.undo_stack = []
+
+    @property
+    def board(self):
+        # board[r][c]로 읽는 코드를 위한 2차원 리스트 (읽기 전용 사본, 수정은 applyMove로)
+        cells = self.cells
+        return [list(cells[r * BOARD_COLUMN:(r + 1) * BOARD_COLUMN]) for r in range(BOARD_ROW)]
+
+    @property
+    def initial_board(self):
+        cells = self.initial_cells
+        return [list(cells[r * BOARD_COLUMN:(r + 1) * BOARD_COLUMN]) for r in range(BOARD_ROW)]
+
+    def _patch_prefix(self, r1, c1, r2, c2):
+        """(r1, c1) ~ (r2, c2) 칸이 바뀐 뒤 영향을 받는 누적합 구간만 다시 계산"""
+        cells = self.cells
+
+        # 행/열 누적합: 바뀐 행(열)의 c1(r1) 이후만 갱신
+        # (한 줄 한 열을 슬라이스로 잘라 훑음, 열은 BOARD_COLUMN 간격 슬라이스)
+        for r in range(r1, r2 + 1):
+            counts = self.row_count[r]
+            acc = counts[c1]
+            c = c1
+            for value in cells[r * BOARD_COLUMN + c1:(r + 1) * BOARD_COLUMN]:
+                if value != 0:
+                    acc += 1
+                c += 1
+                counts[c] = acc
+        for c in range(c1, c2 + 1):
+            counts = self.col_count[c]
+            acc = counts[r1]
+            r = r1
+            for value in cells[r1 * BOARD_COLUMN + c::BOARD_COLUMN]:
+                if value != 0:
+                    acc += 1
+                r += 1
+                counts[r] = acc
+
+        # 2차원 누적합: (r1, c1)보다 오른쪽 아래 구간만 갱신
+        sum_table = self.sum_table
+        count_table = self.count_table
+        for r in range(r1, BOARD_ROW):
+            row = cells[r * BOARD_COLUMN:(r + 1) * BOARD_COLUMN]
+            prev_sum, cur_sum = sum_table[r], sum_table[r + 1]
+            prev_cnt, cur_cnt = count_table[r], count_table[r + 1]
+            line_sum = cur_sum[c1] - prev_sum[c1]
+            line_cnt = cur_cnt[c1] - prev_cnt[c1]
+            for c in range(c1, BOARD_COLUMN):
+                value = row[c]
+                if value != 0:
+                    line_sum += value
+                    line_cnt += 1
+                cur_sum[c + 1] = prev_sum[c + 1] + line_sum
+                cur_cnt[c + 1] = prev_cnt[c + 1] + line_cnt
+
+    # 사각형 (r1, c1) ~ (r2, c2)이 유효한지 검사 (합이 10이고, 네 변을 모두 포함)
     def isValid(self, r1, c1, r2, c2):
-        """메모리 최적화된 유효성 검사"""
-        sums = 0
-        border_flags = 0  # 비트마스크로 4개 플래그를 1개 변수로
-        # bit 0: top, bit 1: bottom, bit 2: left, bit 3: right
-        
+        """누적합 테이블 기반 O(1) 유효성 검사"""
+        s = self.sum_table
+        if s[r2 + 1][c2 + 1] - s[r1][c2 + 1] - s[r2 + 1][c1] + s[r1][c1] != 10:
+            return False
+
+        # 네 변(위/아래 행, 왼/오른 열)에 숫자가 하나 이상 남아 있어야 함
+        top, bottom = self.row_count[r1], self.row_count[r2]
+        left, right = self.col_count[c1], self.col_count[c2]
+        return (
+            top[c2 + 1] != top[c1]
+            and bottom[c2 + 1] != bottom[c1]
+            and left[r2 + 1] != left[r1]
+            and right[r2 + 1] != right[r1]
+        )
+
+    def _recheck_legal_moves(self, r1, c1, r2, c2):
+        """
+        (r1, c1) ~ (r2, c2)와 겹치는 사각형만 다시 검사해 legal_moves 갱신
+        겹치지 않는 사각형은 칸이 바뀌지 않았으므로 유효성도 그대로임
+
+        Returns:
+            (제거된 id 목록, 추가된 id 목록)
+        """
+        legal = self.legal_moves
+        s = self.sum_table
+        col_pairs = len(COL_PAIRS)
+        digits = self.digit_bits
+        borders = RECT_BORDERS
+        removed = []
+        added = []
+
+        for top in range(r2 + 1):
+            s_top = s[top]
+            for bottom in range(r1 if top < r1 else top, BOARD_ROW):
+                s_bottom = s[bottom + 1]
+                base = ROW_PAIR[top][bottom] * col_pairs
+                for left in range(c2 + 1):
+                    col_pair = COL_PAIR[left]
+                    outer = s_bottom[left] - s_top[left]
+                    for right in range(c1 if left < c1 else left, BOARD_COLUMN):
+                        total = s_bottom[right + 1] - s_top[right + 1] - outer
+                        # 숫자는 음수가 없으므로 오른쪽으로 넓힐수록 합이 커짐
+                        if total > 10:
+                            break
+                        rect_id = base + col_pair[right]
+                        if total == 10:
+                            # 네 변에 숫자가 남았는지는 변 마스크와 숫자 비트보드로 확인
+                            top_line, bottom_line, left_line, right_line = borders[rect_id]
+                            valid = bool(
+                                digits & top_line
+                                and digits & bottom_line
+                                and digits & left_line
+                                and digits & right_line
+                            )
+                        else:
+                            valid = False
+                        if valid:
+                            if rect_id not in legal:
+                                legal.add(rect_id)
+                                added.append(rect_id)
+                        elif rect_id in legal:
+                            legal.discard(rect_id)
+                            removed.append(rect_id)
+
+        for rect_id in removed:
+            self._cover(rect_id, -1)
+        for rect_id in added:
+            self._cover(rect_id, 1)
+        return removed, added
+
+    def _cover(self, move_id, delta):
+        # 위협 지도에서 사각형이 덮는 칸들의 값을 delta만큼 바꿈
+        r1, c1, r2, c2 = RECTS[move_id]
+        threat = self.threat
+        for r in range(r1, r2 + 1):
+            base = r * BOARD_COLUMN
+            for i in range(base + c1, base + c2 + 1):
+                threat[i] += delta
+
+    def _is_threatened(self, r1, c1, r2, c2):
+        # 현재 국면에서 (r1, c1) ~ (r2, c2) 안의 칸을 덮는 유효 사각형이 있는지
+        threat = self.threat
         for r in range(r1, r2 + 1):
-            for c in range(c1, c2 + 1):
-                if self.board[r][c] != 0:
-                    sums += self.board[r][c]
-                    # 조기 종료: 합이 10 초과
-                    if sums > 10:
-                        return False
-                    
-                    # 비트마스크로 테두리 플래그 업데이트
-                    if r == r1: border_flags |= 1  # bit 0
-                    if r == r2: border_flags |= 2  # bit 1  
-                    if c == c1: border_flags |= 4  # bit 2
-                    if c == c2: border_flags |= 8  # bit 3
-        
-        # 합이 10이고 모든 테두리가 커버되는지 확인 (15 = 1111 in binary)
-        return sums == 10 and border_flags == 15
+            base = r * BOARD_COLUMN
+            for i in range(base + c1, base + c2 + 1):
+                if threat[i]:
+                    return True
+        return False
+
+    def is_move_safe(self, r1, c1, r2, c2):
+        # 이 수를 둔 뒤 상대가 그 칸을 다시 빼앗을 수 있는 사각형이 없는지 (위협 지도 조회)
+        self.applyMove(r1, c1, r2, c2, True)
+        safe = not self._is_threatened(r1, c1, r2, c2)
+        self.undoMove()
+        return safe
+
+    def _enumerate_valid_rectangles(self):
+        """
+        보드 전체의 유효한 사각형을 한 번에 구함
+        NumPy가 있으면 누적합 배열로 모든 (r1, c1, r2, c2)를 벡터 연산으로 검사하고,
+        없으면 행 구간별 두 포인터 탐색(_sweep_valid_rectangles)으로 구함
+
+        Returns:
+            유효한 사각형 id 목록 (id 순서)
+        """
+        if np is None:
+            return self._sweep_valid_rectangles()
+
+        board = np.frombuffer(self.cells, dtype=np.uint8).reshape(BOARD_ROW, BOARD_COLUMN).astype(np.int64)
+        nonzero = (board != 0).astype(np.int64)
+
+        # 2차원 누적합 (앞에 0 행/열을 붙인 형태)
+        table = np.zeros((BOARD_ROW + 1, BOARD_COLUMN + 1), dtype=np.int64)
+        table[1:, 1:] = board.cumsum(0).cumsum(1)
+        # 모든 (행 쌍, 열 쌍)의 구간 합, shape: (행 쌍 수, 열 쌍 수)
+        sums = (
+            table[np.ix_(PAIR_R2 + 1, PAIR_C2 + 1)]
+            - table[np.ix_(PAIR_R1, PAIR_C2 + 1)]
+            - table[np.ix_(PAIR_R2 + 1, PAIR_C1)]
+            + table[np.ix_(PAIR_R1, PAIR_C1)]
+        )
+
+        # 행/열별 숫자 칸 누적 개수 (네 변 검사용)
+        row_count = np.zeros((BOARD_ROW, BOARD_COLUMN + 1), dtype=np.int64)
+        row_count[:, 1:] = nonzero.cumsum(1)
+        col_count = np.zeros((BOARD_COLUMN, BOARD_ROW + 1), dtype=np.int64)
+        col_count[:, 1:] = nonzero.T.cumsum(1)
+
+        top = row_count[np.ix_(PAIR_R1, PAIR_C2 + 1)] - row_count[np.ix_(PAIR_R1, PAIR_C1)]
+        bottom = row_count[np.ix_(PAIR_R2, PAIR_C2 + 1)] - row_count[np.ix_(PAIR_R2, PAIR_C1)]
+        left = (col_count[np.ix_(PAIR_C1, PAIR_R2 + 1)] - col_count[np.ix_(PAIR_C1, PAIR_R1)]).T
+        right = (col_count[np.ix_(PAIR_C2, PAIR_R2 + 1)] - col_count[np.ix_(PAIR_C2, PAIR_R1)]).T
+
+        valid = (sums == 10) & (top > 0) & (bottom > 0) & (left > 0) & (right > 0)
+        return np.flatnonzero(valid).tolist()
+
+    def _sweep_valid_rectangles(self):
+        """
+        행 구간(r1, r2)마다 열별 합을 유지하며, c1/c2 두 포인터로 합이 정확히 10인 열 구간만 찾음
+        숫자가 모두 0 이상이므로 c1이 커지면 합이 10 이상이 되는 c2도 줄지 않음 -> O(R^2 * C)
+        왼/오른 변은 그 열의 구간 합이 0보다 크면 숫자가 있는 것이므로 위/아래 변만 따로 검사
+
+        Returns:
+            유효한 사각형 id 목록 (id 순서)
+        """
+        cells = self.cells
+        row_count = self.row_count
+        ids = []
+        for r1 in range(BOARD_ROW):
+            col_sum = [0] * BOARD_COLUMN  # r1 ~ r2행의 열별 합
+            top = row_count[r1]
+            for r2 in range(r1, BOARD_ROW):
+                row = cells[r2 * BOARD_COLUMN:(r2 + 1) * BOARD_COLUMN]
+                for c in range(BOARD_COLUMN):
+                    col_sum[c] += row[c]
+                bottom = row_count[r2]
+                base = ROW_PAIR[r1][r2] * len(COL_PAIRS)
+
+                c2 = 0  # 창은 c1 ~ c2-1열
+                window = 0
+                for c1 in range(BOARD_COLUMN):
+                    while window < 10 and c2 < BOARD_COLUMN:
+                        window += col_sum[c2]
+                        c2 += 1
+                    if window < 10:
+                        break  # 오른쪽 끝까지 더해도 10이 안 되면 c1을 늘려도 마찬가지
+                    # 합 10에 도달시킨 마지막 열(c2-1)은 합이 0보다 크므로 오른 변은 항상 만족
+                    if window == 10 and col_sum[c1] and top[c2] != top[c1] and bottom[c2] != bottom[c1]:
+                        ids.append(base + COL_PAIR[c1][c2 - 1])
+                    window -= col_sum[c1]
+        return ids
+
+    def _remaining_digits(self):
+        # 보드에 남은 숫자 칸 수
+        return self.count_table[BOARD_ROW][BOARD_COLUMN]
+
+    @property
+    def territory_board(self):
+        # 점령 여부 보드 (1: 내 땅, -1: 상대 땅, 0: 미점령), 비트보드에서 만들어 반환
+        territory = [[0] * BOARD_COLUMN for _ in range(BOARD_ROW)]
+        for r in range(BOARD_ROW):
+            for c in range(BOARD_COLUMN):
+                bit = 1 << (r * BOARD_COLUMN + c)
+                if self.my_bits & bit:
+                    territory[r][c] = 1
+                elif self.opp_bits & bit:
+                    territory[r][c] = -1
+        return territory
 
     def _calculate_board_value(self):
-        # 현재 territory_board 기준으로 점수 계산
-        return sum([sum(row) for row in self.territory_board])
+        # 누적 평가값 (기본 가중치면 내 땅 칸 수 - 상대 땅 칸 수)
+        return self.score
 
     def _simulate_negamax(self, alpha: int, beta: int, depth: int, color: int) -> tuple[int, list[int]]:
         """
@@ -69,95 +758,832 @@ class Game:
         Returns:
             (현재 상태의 최대 점수, 최적 수)
         """
-        original_board = deepcopy(self.board)
-        original_territory_board = deepcopy(self.territory_board)
         best_move = PASS
         best_value = -math.inf
         is_terminal = True
 
-        if depth == DEPTH:
+        self.nodes += 1
+        if self.nodes % TIME_CHECK_INTERVAL == 0 and time.perf_counter() > self.deadline:
+            raise SearchTimeout
+        stats = self.stats
+        if stats is not None:
+            stats.nodes[depth] += 1
+
+        if depth == self.max_depth:
+            self.hit_horizon = True
             return color * self._calculate_board_value(), PASS
 
-        for r1 in range(BOARD_ROW):
-            for r2 in range(r1, BOARD_ROW):
-                for c1 in range(BOARD_COLUMN):
-                    for c2 in range(c1, BOARD_COLUMN):
-                        if not self.isValid(r1, c1, r2, c2):
-                            continue
+        # 숫자가 2칸 미만이면 합 10을 만들 수 없으므로 바로 종료 상태
+        if self._remaining_digits() < 2:
+            return color * self._calculate_board_value(), PASS
+
+        # 치환표 확인: 같은 국면을 남은 깊이 이상으로 탐색한 적이 있으면 재사용
+        remaining = self.max_depth - depth
+        key = self.hash if color == 1 else self.hash ^ ZOBRIST_OPP_TO_MOVE
+        entry = self.tt.probe(key)
+        if stats is not None:
+            stats.tt_probes += 1
+            stats.tt_hits += entry is not None
+        # 루트에서는 항상 직접 탐색 (마친 깊이와 최적 수를 정확히 알기 위함)
+        if depth > 0 and entry is not None and entry[1] >= remaining:
+            # 저장된 값도 깊이 제한에 걸렸을 수 있으므로 반복 심화를 계속하도록 표시
+            self.hit_horizon = True
+            _, _, flag, value, move_id = entry
+            if flag == TT_EXACT:
+                return value, list(RECTS[move_id]) if move_id >= 0 else PASS
+            if flag == TT_LOWER:
+                alpha = max(alpha, value)
+            else:
+                beta = min(beta, value)
+            if alpha >= beta:
+                return value, list(RECTS[move_id]) if move_id >= 0 else PASS
+        alpha_orig = alpha
+        best_id = -1
+        hash_move = entry[4] if entry is not None else -1
 
-                        is_terminal = False
-                        self.updateMove(r1, c1, r2, c2, color == 1)
+        # 지평선 바로 앞: 자식을 하나씩 두고 평가하는 대신 모든 자식 값을 한 번에 계산
+        # (칸별 가중치나 안전 가산점은 수를 둔 뒤 국면이 필요하므로 그때는 평소대로 탐색)
+        if remaining == 1 and self.legal_moves and CELL_WEIGHTS is None and not SAFE_WEIGHT:
+            self.hit_horizon = True
+            best_value, best_id = self._best_frontier_child(color)
+            if best_value >= beta:
+                self._record_cutoff(best_id, color, depth, remaining)
+                flag = TT_LOWER
+            elif best_value <= alpha_orig:
+                flag = TT_UPPER
+            else:
+                flag = TT_EXACT
+            self.tt.store(key, remaining, flag, best_value, best_id)
+            return best_value, list(RECTS[best_id])
 
-                        # 다음 턴: color 뒤집어서 상대 입장
-                        value, _ = self._simulate_negamax(-beta, -alpha, depth + 1, -color)
-                        value = -value  # 점수 반전
+        # 유효한 사각형만, 컷이 잘 나도록 정렬된 순서로 탐색
+        moves = self._order_moves(self.legal_moves, color, depth, hash_move)
+        for move_id in moves:
+            r1, c1, r2, c2 = RECTS[move_id]
+            is_terminal = False
+            self.applyMove(r1, c1, r2, c2, color == 1)
 
-                        if value > best_value:
-                            best_value = value
-                            best_move = [r1, c1, r2, c2]
-                            alpha = max(alpha, value)
+            # 다음 턴: color 뒤집어서 상대 입장
+            value, _ = self._simulate_negamax(-beta, -alpha, depth + 1, -color)
+            value = -value  # 점수 반전
+            # 안전한 수 가산점 (수를 둔 직후 국면의 위협 지도로 판단)
+            if SAFE_WEIGHT and not self._is_threatened(r1, c1, r2, c2):
+                value += SAFE_WEIGHT
 
-                        self.restoreMove(r1, c1, r2, c2, original_board, original_territory_board)
+            if value > best_value:
+                best_value = value
+                best_move = [r1, c1, r2, c2]
+                best_id = move_id
+                alpha = max(alpha, value)
 
-                        if alpha >= beta:
-                            return alpha, best_move
+            self.undoMove()
+
+            if alpha >= beta:
+                if stats is not None:
+                    stats.cutoffs += 1
+                    order = moves.index(move_id)
+                    stats.cutoff_order[order] = stats.cutoff_order.get(order, 0) + 1
+                self._record_cutoff(move_id, color, depth, remaining)
+                self.tt.store(key, remaining, TT_LOWER, alpha, best_id)
+                return alpha, best_move
 
         if is_terminal:
             return color * self._calculate_board_value(), PASS
+
+        flag = TT_UPPER if best_value <= alpha_orig else TT_EXACT
+        self.tt.store(key, remaining, flag, best_value, best_id)
+        return best_value, best_move
+
+    def _solve_endgame(self, alpha, beta, color, passed):
+        """
+        깊이 제한 없이 게임 끝까지 정확히 탐색하는 negamax (종반 전용)
+        패스도 수로 포함: 직전 수가 패스(passed)인데 또 패스하면 게임 끝
+        둘 수 있는 사각형이 없으면 둘 다 패스할 수밖에 없으므로 바로 끝
+
+        Returns:
+            (둘 차례 입장의 최종 평가값, 최적 수)
+        """
+        self.nodes += 1
+        if self.nodes % TIME_CHECK_INTERVAL == 0 and time.perf_counter() > self.deadline:
+            raise SearchTimeout
+        stats = self.stats
+        if stats is not None:
+            stats.nodes[min(len(self.undo_stack) - stats.root_ply, DEPTH)] += 1
+
+        if not self.legal_moves:
+            return color * self._calculate_board_value(), PASS
+
+        key = (self.hash if color == 1 else self.hash ^ ZOBRIST_OPP_TO_MOVE, passed)
+        entry = self.endgame_memo.get(key)
+        if stats is not None:
+            stats.tt_probes += 1
+            stats.tt_hits += entry is not None
+        hash_move = -1
+        if entry is not None:
+            flag, value, hash_move = entry
+            if flag == TT_EXACT:
+                return value, list(RECTS[hash_move]) if hash_move >= 0 else PASS
+            if flag == TT_LOWER:
+                alpha = max(alpha, value)
+            else:
+                beta = min(beta, value)
+            if alpha >= beta:
+                return value, list(RECTS[hash_move]) if hash_move >= 0 else PASS
+        alpha_orig = alpha
+
+        # 같은 값이면 패스보다 실제 수를 두도록 수부터 탐색
+        best_value, best_id = -math.inf, -1
+        moves = self._order_moves(self.legal_moves, color, 0, hash_move)
+        for move_id in moves:
+            self.applyMove(*RECTS[move_id], color == 1)
+            value, _ = self._solve_endgame(-beta, -alpha, -color, False)
+            self.undoMove()
+            value = -value
+            if value > best_value:
+                best_value, best_id = value, move_id
+                if value > alpha:
+                    alpha = value
+                    if alpha >= beta:
+                        if stats is not None:
+                            stats.cutoffs += 1
+                            order = moves.index(move_id)
+                            stats.cutoff_order[order] = stats.cutoff_order.get(order, 0) + 1
+                        break
+
+        # 패스: 상대도 방금 패스했으면 지금 점수로 끝, 아니면 상대가 이어서 둠
+        if alpha < beta:
+            if passed:
+                value = color * self._calculate_board_value()
+            else:
+                self.applyMove(*PASS, color == 1)
+                value, _ = self._solve_endgame(-beta, -alpha, -color, True)
+                self.undoMove()
+                value = -value
+            if value > best_value:
+                best_value, best_id = value, -1
+
+        if best_value >= beta:
+            flag = TT_LOWER
+        elif best_value <= alpha_orig:
+            flag = TT_UPPER
         else:
-            return best_value, best_move
+            flag = TT_EXACT
+        self.endgame_memo[key] = (flag, best_value, best_id)
+        return best_value, list(RECTS[best_id]) if best_id >= 0 else PASS
 
-    def calculateMove(self, _myTime, _oppTime) -> list[int]:
+    def _best_frontier_child(self, color):
         """
-        현재 상태에서 최적 수 계산
+        둘 차례(color) 입장에서 각 자식 국면의 평가값을 한 번에 계산해 가장 좋은 수를 고름
+        자식 값 = color * 현재 평가값 + OWN_WEIGHT * (얻는 칸 + 빼앗는 칸) + STEAL_WEIGHT * 빼앗는 칸
+        얻는 칸 = 면적 - 이미 내 땅인 칸 (applyMove의 평가값 갱신과 같은 식)
+        자식마다 수를 두지 않고 비트보드 popcount로 바로 계산
+        (유효 사각형은 많아야 수십 개라 NumPy 호출 비용이 popcount 반복보다 커서 벡터화하지 않음)
 
         Returns:
-            (r1, c1, r2, c2) 형태의 수
+            (최적 값, 최적 수 id)
         """
+        if color == 1:
+            mine, theirs = self.my_bits, self.opp_bits
+        else:
+            mine, theirs = self.opp_bits, self.my_bits
+        base = color * self._calculate_board_value()
 
-        global DEPTH
+        best_value, best_id = -math.inf, -1
+        for move_id in self.legal_moves:
+            mask = RECT_MASKS[move_id]
+            stolen = (mask & theirs).bit_count()
+            value = OWN_WEIGHT * ((mask & ~mine).bit_count() + stolen) + STEAL_WEIGHT * stolen
+            if value > best_value:
+                best_value, best_id = value, move_id
+        return base + best_value, best_id
 
-        if self.turn <= 5:
-            pass
-        elif self.turn <= 9:
-            DEPTH = 3
-        elif self.turn <= 12:
-            DEPTH = 4
-        elif self.turn <= 14:
-            DEPTH = 5
+    def _order_moves(self, moves, color, ply, hash_move):
+        """
+        탐색 순서 정렬
+        1. 치환표에 저장된 최적 수
+        2. 상대 땅을 빼앗는 수 (바뀌는 점수가 큰 순서)
+        3. 이 깊이의 킬러 수
+        4. 나머지는 history 점수, 같으면 얻는 칸 수 순서
+        """
+        if color == 1:
+            mine, theirs = self.my_bits, self.opp_bits
         else:
-            DEPTH = min(DEPTH + 1, 100)  # 최대 100까지 증가
+            mine, theirs = self.opp_bits, self.my_bits
+        killers = self.killers[ply]
+        history = self.history
+
+        keys = {}
+        for move_id in moves:
+            mask = RECT_MASKS[move_id]
+            stolen = (mask & theirs).bit_count()
+            gain = (mask & ~mine).bit_count() + stolen  # 이 수로 바뀌는 점수
+            if move_id == hash_move:
+                keys[move_id] = ORDER_HASH
+            elif stolen:
+                keys[move_id] = ORDER_STEAL + gain
+            elif move_id in killers:
+                keys[move_id] = ORDER_KILLER
+            else:
+                keys[move_id] = (history[move_id] << 8) + gain
+        return sorted(keys, key=keys.__getitem__, reverse=True)
 
-        _, best_move = self._simulate_negamax(-math.inf, math.inf, 0, 1)
+    def _record_cutoff(self, move_id, color, ply, remaining):
+        # beta 컷을 낸 조용한 수(빼앗지 않는 수)를 킬러/history에 기록
+        theirs = self.opp_bits if color == 1 else self.my_bits
+        if RECT_MASKS[move_id] & theirs:
+            return
+        killers = self.killers[ply]
+        if killers[0] != move_id:
+            killers[1:] = killers[:-1]
+            killers[0] = move_id
+        self.history[move_id] += remaining * remaining
+
+    def calculateMove(self, myTime, _oppTime) -> list[int]:
+        """
+        현재 상태에서 최적 수 계산 (남은 시간 기반 반복 심화)
+        깊이 1부터 하나씩 늘려가며 탐색하고, 마감 시간이 지나면
+        마지막으로 끝까지 마친 깊이의 최적 수를 사용
+
+        Args:
+            myTime: 내 남은 시간 (ms)
+            oppTime: 상대 남은 시간 (ms)
+
+        Returns:
+            (r1, c1, r2, c2) 형태의 수
+        """
+        start = time.perf_counter()
+        budget_ms = self._time_budget(myTime)
+        self.deadline = start + budget_ms / 1000
+        self.nodes = 0
+        if TRACE:
+            self.stats = SearchStats()
+            self.stats.root_ply = len(self.undo_stack)
+        if ENGINE == "mcts":
+            best_move = self._search_mcts(budget_ms)
+            self.last_budget_ms = budget_ms
+            self.last_elapsed_ms = (time.perf_counter() - start) * 1000
+            if self.stats is not None:
+                self.stats.report(self, "mcts", self.last_depth, budget_ms, self.last_elapsed_ms, self.stats.pv)
+                self.stats = None
+            self.turn += 1
+            return best_move
+
+        # 반복 심화가 "시간의 절반을 썼는지" 판단하는 기준 (종반 풀이에 실패하면 남은 시간 기준으로 다시 잼)
+        search_start, search_ms = start, budget_ms
+
+        # 종반: 남은 수가 적으면 시간의 일부 안에서 끝까지 풀어 보고, 못 풀면 반복 심화로 넘어감
+        # (풀다 만 결과도 endgame_memo에 남아 다음 수의 풀이가 빨라짐)
+        if len(self.legal_moves) <= ENDGAME_MOVES:
+            passed = bool(self.played) and self.played[-1][:4] == (-1, -1, -1, -1)
+            base = len(self.undo_stack)
+            self.deadline = start + budget_ms * ENDGAME_BUDGET / 1000
+            try:
+                _, move = self._solve_endgame(-math.inf, math.inf, 1, passed)
+            except SearchTimeout:
+                while len(self.undo_stack) > base:
+                    self.undoMove()
+                self.deadline = start + budget_ms / 1000
+                search_start = time.perf_counter()
+                search_ms = budget_ms - (search_start - start) * 1000
+            else:
+                self.last_depth = DEPTH  # 게임 끝까지 탐색
+                self.last_budget_ms = budget_ms
+                self.last_elapsed_ms = (time.perf_counter() - start) * 1000
+                if self.stats is not None:
+                    pv = self._endgame_variation(passed)
+                    self.stats.report(self, "endgame", DEPTH, budget_ms, self.last_elapsed_ms, pv)
+                    self.stats = None
+                self.turn += 1
+                return move
+
+        best_move = self._fallback_move()
+        completed_depth = 0
+        base = len(self.undo_stack)
+
+        # 수 정렬 정보: 킬러는 국면이 바뀌었으니 비우고, history는 절반으로 줄여 최근 값 위주로
+        for killers in self.killers:
+            killers[:] = [-1] * KILLER_SLOTS
+        self.history = [score >> 1 for score in self.history]
+
+        for depth in range(1, DEPTH + 1):
+            self.max_depth = depth
+            self.hit_horizon = False
+            try:
+                if self.pool is not None and self.legal_moves:
+                    _, move = self._search_root_parallel(depth, best_move)
+                else:
+                    _, move = self._simulate_negamax(-math.inf, math.inf, 0, 1)
+            except SearchTimeout:
+                # 중단된 탐색이 적용해 둔 수들을 모두 되돌림
+                while len(self.undo_stack) > base:
+                    self.undoMove()
+                break
+
+            best_move = move
+            completed_depth = depth
+
+            # 깊이 제한에 걸린 노드가 없으면 게임 끝까지 다 본 것
+            if not self.hit_horizon:
+                break
+            # 다음 깊이는 훨씬 오래 걸리므로, 이미 절반 이상 썼으면 멈춤
+            if time.perf_counter() - search_start > search_ms / 2000:
+                break
+
+        self.last_depth = completed_depth
+        self.last_budget_ms = budget_ms
+        self.last_elapsed_ms = (time.perf_counter() - start) * 1000
+        if self.stats is not None:
+            pv = self._principal_variation(completed_depth)
+            self.stats.report(self, "negamax", completed_depth, budget_ms, self.last_elapsed_ms, pv)
+            self.stats = None
         self.turn += 1
         return best_move
 
+    def start_workers(self, count):
+        """
+        루트 분할 병렬 탐색용 워커 프로세스 시작 (게임마다 한 번, INIT 직후)
+        워커는 처음 보드로 자기 Game을 만들어 두고, 매 수마다 둔 수 목록만 받아 따라감
+        """
+        self.shared_alpha = multiprocessing.Value("d", -math.inf)
+        self.pool = multiprocessing.Pool(
+            count, initializer=_init_worker, initargs=(self.initial_board, self.shared_alpha)
+        )
+
+    def stop_workers(self):
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool = None
+
+    def _search_root_parallel(self, depth, previous_move):
+        """
+        루트의 유효 사각형을 정렬한 뒤 워커 수만큼 번갈아 나눠 주고(좋은 수가 고루 퍼지도록)
+        각 워커의 최적 값 중 가장 큰 것을 고름
+        한 워커라도 마감 시각까지 못 마치면 이 깊이는 버림 (SearchTimeout)
+        """
+        hash_move = rect_id(*previous_move) if previous_move != PASS else -1
+        moves = self._order_moves(self.legal_moves, 1, 0, hash_move)
+        chunks = [moves[i::WORKERS] for i in range(WORKERS) if moves[i::WORKERS]]
+
+        self.shared_alpha.value = -math.inf
+        # 프로세스끼리는 perf_counter 기준이 다를 수 있으므로 벽시계 시각으로 넘김
+        deadline = time.time() + (self.deadline - time.perf_counter())
+        pending = [
+            self.pool.apply_async(_search_root_chunk, (self.played, chunk, depth, deadline))
+            for chunk in chunks
+        ]
+
+        best_value, best_id = -math.inf, -1
+        for result in pending:
+            wait = None
+            if self.deadline != math.inf:
+                wait = max(self.deadline - time.perf_counter(), 0) + WORKER_GRACE_MS / 1000
+            try:
+                out = result.get(timeout=wait)
+            except multiprocessing.TimeoutError:
+                out = None
+            if out is None:
+                raise SearchTimeout
+            value, move_id, hit_horizon, nodes = out
+            self.nodes += nodes
+            self.hit_horizon |= hit_horizon
+            if move_id >= 0 and value > best_value:
+                best_value, best_id = value, move_id
+        return best_value, list(RECTS[best_id])
+
+    def _search_root_chunk(self, move_ids, depth, shared_alpha):
+        """
+        (워커에서 실행) 루트 수 일부만 탐색
+        다른 워커가 찾은 최선 값(shared_alpha)을 alpha로 써서 가지치기하고,
+        alpha보다 나은 값을 찾으면 공유 값을 올림
+
+        Returns:
+            (최적 값, 최적 수 id, 깊이 제한에 걸렸는지, 노드 수), alpha를 넘는 수가 없으면 id는 -1
+            마감 시각이 지나면 None
+        """
+        self.max_depth = depth
+        self.hit_horizon = False
+        self.nodes = 0
+        best_value, best_id = -math.inf, -1
+        base = len(self.undo_stack)
+        try:
+            for move_id in move_ids:
+                alpha = max(best_value, shared_alpha.value)
+                r1, c1, r2, c2 = RECTS[move_id]
+                self.applyMove(r1, c1, r2, c2, True)
+                value, _ = self._simulate_negamax(-math.inf, -alpha, 1, -1)
+                value = -value
+                if SAFE_WEIGHT and not self._is_threatened(r1, c1, r2, c2):
+                    value += SAFE_WEIGHT
+                self.undoMove()
+
+                if value > alpha:
+                    best_value, best_id = value, move_id
+                    with shared_alpha.get_lock():
+                        if value > shared_alpha.value:
+                            shared_alpha.value = value
+        except SearchTimeout:
+            while len(self.undo_stack) > base:
+                self.undoMove()
+            return None
+        return best_value, best_id, self.hit_horizon, self.nodes
+
+    def start_pondering(self):
+        """
+        상대 차례 동안 백그라운드 스레드에서 상대 입장(color=-1)으로 반복 심화 탐색 시작
+        상대의 유력한 응수 뒤 국면들이 치환표에 채워져, 다음 calculateMove가
+        최적 수 힌트와 컷을 바로 얻음
+        stop_pondering 전까지 Game 상태는 이 스레드만 건드려야 함
+        """
+        self.deadline = math.inf
+        self.nodes = 0
+        self.ponder_thread = threading.Thread(target=self._ponder, daemon=True)
+        self.ponder_thread.start()
+
+    def stop_pondering(self):
+        # 마감 시각을 과거로 당겨 탐색을 중단시키고, 수를 모두 되돌릴 때까지 기다림
+        if self.ponder_thread is None:
+            return
+        self.deadline = 0.0
+        self.ponder_thread.join()
+        self.ponder_thread = None
+
+    def _ponder(self):
+        base = len(self.undo_stack)
+        try:
+            for depth in range(1, DEPTH + 1):
+                self.max_depth = depth
+                self.hit_horizon = False
+                try:
+                    self._simulate_negamax(-math.inf, math.inf, 0, -1)
+                except SearchTimeout:
+                    return
+                if not self.hit_horizon:
+                    return
+        finally:
+            # 중단이든 다른 예외든, 탐색이 적용해 둔 수를 모두 되돌려 실제 국면으로 돌려놓음
+            # (되돌리지 않으면 다음 calculateMove가 탐색 중간 국면에서 수를 고름)
+            while len(self.undo_stack) > base:
+                self.undoMove()
+
+    def _search_mcts(self, budget_ms):
+        """
+        UCT 몬테카를로 트리 탐색
+        선택 -> 확장(한 노드) -> 플레이아웃 -> 역전파를 시간이 다할 때까지 반복하고
+        가장 많이 방문한 루트 자식을 둠 (언제 멈춰도 그때까지의 최선 수가 있음)
+        """
+        start = time.perf_counter()
+        deadline = start + budget_ms / 1000
+        rng = random.Random(self.turn)
+        root = MCTSNode(None, -1, 1, self._mcts_untried(1))
+        if not root.untried:
+            return PASS
+
+        playouts = 0
+        max_depth = 0
+        while time.perf_counter() < deadline:
+            node = root
+            applied = 0
+            # 선택: 모든 수를 펼친 노드는 UCT로 자식을 따라 내려감
+            while not node.untried and node.children:
+                node = node.select_child()
+                self.applyMove(*RECTS[node.move_id], node.color == -1)
+                applied += 1
+            # 확장: 아직 펼치지 않은 수 하나를 자식으로
+            if node.untried:
+                move_id = node.untried.pop()
+                self.applyMove(*RECTS[move_id], node.color == 1)
+                applied += 1
+                child = MCTSNode(node, move_id, -node.color, self._mcts_untried(-node.color))
+                node.children.append(child)
+                node = child
+            max_depth = max(max_depth, applied)
+            if self.stats is not None:
+                self.stats.nodes[min(applied, DEPTH)] += 1
+
+            reward = self._playout(node.color, rng)
+            for _ in range(applied):
+                self.undoMove()
+
+            # 역전파: 각 노드로 오는 수를 둔 쪽(-node.color) 입장의 보상으로 누적
+            while node is not None:
+                node.visits += 1
+                node.total -= reward * node.color
+                node = node.parent
+            playouts += 1
+
+        # 트리 노드는 플레이아웃마다 하나씩 생기므로 노드 수 = 플레이아웃 수
+        self.nodes = self.playouts = playouts
+        elapsed = time.perf_counter() - start
+        self.last_playouts_per_sec = playouts / elapsed if elapsed > 0 else 0
+        self.last_depth = max_depth
+        if self.stats is not None:
+            # 가장 많이 방문한 자식을 따라간 수순
+            node = root
+            while node.children:
+                node = max(node.children, key=lambda child: child.visits)
+                self.stats.pv.append(list(RECTS[node.move_id]))
+        if not root.children:
+            return self._fallback_move()
+        best = max(root.children, key=lambda child: child.visits)
+        return list(RECTS[best.move_id])
+
+    def _mcts_untried(self, color):
+        # 펼칠 수 목록: 바뀌는 점수가 작은 순서 (끝에서부터 꺼내므로 큰 수부터 펼침)
+        mine, theirs = (self.my_bits, self.opp_bits) if color == 1 else (self.opp_bits, self.my_bits)
+        return sorted(
+            self.legal_moves,
+            key=lambda move_id: (RECT_MASKS[move_id] & ~mine).bit_count()
+            + (RECT_MASKS[move_id] & theirs).bit_count(),
+        )
+
+    def _playout(self, color, rng):
+        """
+        현재 국면에서 정책대로 MCTS_PLAYOUT_PLIES 수까지 두어 보고 보상을 구함 (국면은 되돌림)
+
+        Returns:
+            내 입장 보상 (-1 ~ 1)
+        """
+        applied = 0
+        for _ in range(MCTS_PLAYOUT_PLIES):
+            if not self.legal_moves:
+                break
+            if MCTS_POLICY == "random":
+                move_id = rng.choice(tuple(self.legal_moves))
+            else:
+                if color == 1:
+                    mine, theirs = self.my_bits, self.opp_bits
+                else:
+                    mine, theirs = self.opp_bits, self.my_bits
+                best_gain = -1
+                for candidate in self.legal_moves:
+                    mask = RECT_MASKS[candidate]
+                    gain = (mask & ~mine).bit_count() + (mask & theirs).bit_count()
+                    if gain > best_gain:
+                        best_gain, move_id = gain, candidate
+            self.applyMove(*RECTS[move_id], color == 1)
+            applied += 1
+            color = -color
+        reward = math.tanh(self._calculate_board_value() / MCTS_SCORE_SCALE)
+        for _ in range(applied):
+            self.undoMove()
+        return reward
+
+    def _principal_variation(self, length):
+        # 치환표의 최적 수를 따라가며 예상 수순을 구함 (국면은 원래대로 되돌림)
+        pv = []
+        color = 1
+        for _ in range(length):
+            key = self.hash if color == 1 else self.hash ^ ZOBRIST_OPP_TO_MOVE
+            entry = self.tt.probe(key)
+            if entry is None or entry[4] not in self.legal_moves:
+                break
+            move = RECTS[entry[4]]
+            pv.append(list(move))
+            self.applyMove(*move, color == 1)
+            color = -color
+        for _ in pv:
+            self.undoMove()
+        return pv
+
+    def _endgame_variation(self, passed):
+        # 종반 풀이 기록(endgame_memo)의 최적 수를 따라가며 끝까지의 수순을 구함 (패스 포함, 국면은 원래대로 되돌림)
+        pv = []
+        color = 1
+        while len(pv) <= DEPTH:
+            key = (self.hash if color == 1 else self.hash ^ ZOBRIST_OPP_TO_MOVE, passed)
+            entry = self.endgame_memo.get(key)
+            if entry is None or (entry[2] < 0 and passed):
+                break
+            move = RECTS[entry[2]] if entry[2] >= 0 else PASS
+            pv.append(list(move))
+            self.applyMove(*move, color == 1)
+            passed = entry[2] < 0
+            color = -color
+        for _ in pv:
+            self.undoMove()
+        return pv
+
+    def _time_budget(self, my_time):
+        # 이번 수에 쓸 시간(ms): 여유분을 뺀 남은 시간을 앞으로 둘 수의 추정치로 나눔
+        # 한 수마다 숫자가 2~4칸 지워지고 두 사람이 번갈아 두므로 내 수는 대략 남은 숫자 / 6
+        moves_left = max(MIN_MOVES_LEFT, self._remaining_digits() // 6)
+        return max(0, my_time - TIME_MARGIN_MS) / moves_left
+
+    def best_rectangles(self, k=1, key="area", region=None):
+        """
+        점수가 가장 큰 유효 사각형 k개 (실제 게임 국면 기준)
+        점수 이름별 우선순위 큐를 처음 질의할 때 만들고, 이후에는 수마다 바뀐 부분만 반영하므로
+        매 턴 보드 전체를 다시 훑지 않음
+
+        Args:
+            k: 개수
+            key: "area" (면적), "steal" (내가 빼앗는 칸 수), "fallback" (면적 + 빼앗는 칸 수),
+                 또는 사각형 id -> 점수 함수 (큐를 만들지 않고 이번 한 번만 훑음)
+            region: (r_start, r_end, c_start, c_end) 이면 그 영역 안의 사각형만
+
+        Returns:
+            사각형 id 목록 (점수 내림차순, 같으면 id 오름차순)
+        """
+        if callable(key):
+            # 호출할 때마다 새로 만든 함수일 수 있어 큐로 남겨 두면 게임 끝까지 쌓이므로 캐시하지 않음
+            candidates = [move_id for move_id in self.legal_moves if rect_in_region(move_id, region)]
+            return heapq.nlargest(k, candidates, key=lambda move_id: (key(move_id), -move_id))
+
+        # 점수 기준과 영역마다 큐를 따로 둠 (영역 질의도 꺼낼 때 영역 밖 항목을 건너뛰지 않도록)
+        rect_queue = self.queues.get((key, region))
+        if rect_queue is None:
+            if key == "area":
+                score, dynamic = lambda move_id: RECT_MASKS[move_id].bit_count(), False
+            elif key == "steal":
+                score, dynamic = lambda move_id: (RECT_MASKS[move_id] & self.opp_bits).bit_count(), True
+            elif key == "fallback":
+                score, dynamic = self._fallback_score, True
+            else:
+                raise ValueError(f"Unknown rectangle score {key!r}")
+            rect_queue = RectangleQueue(self, score, dynamic, region)
+            self.queues[key, region] = rect_queue
+        return rect_queue.top(k)
+
+    def _fallback_score(self, move_id):
+        # 면적 + 빼앗는 칸 수
+        mask = RECT_MASKS[move_id]
+        return mask.bit_count() + (mask & self.opp_bits).bit_count()
+
+    def _fallback_move(self):
+        # 깊이 1 탐색도 못 마쳤을 때 둘 수: 면적 + 빼앗는 칸 수가 가장 큰 사각형 (없으면 패스)
+        best = self.best_rectangles(1, "fallback")
+        if not best:
+            return PASS
+        return list(RECTS[best[0]])
+
     def updateOpponentAction(self, action, _time) -> None:
         # 상대 수 반영
         self.updateMove(*action, False)
 
     def updateMove(self, r1, c1, r2, c2, is_my_turn) -> None:
-        # 수를 보드에 적용
+        # 실제 게임 진행용: 수를 보드에 적용
+        self.applyMove(r1, c1, r2, c2, is_my_turn)
+        self.played.append((r1, c1, r2, c2, is_my_turn))
+
+        # 우선순위 큐 갱신: 새로 유효해진 사각형, 땅이 바뀐 칸과 겹치는 사각형(점수가 바뀌었을 수 있음)
+        record = self.undo_stack[-1]
+        if record is not None and self.queues:
+            added = record[-1]
+            mask = RECT_MASKS[rect_id(r1, c1, r2, c2)]
+            overlapping = [move_id for move_id in self.legal_moves if RECT_MASKS[move_id] & mask]
+            for rect_queue in self.queues.values():
+                rect_queue.update(added)
+                if rect_queue.dynamic:
+                    rect_queue.update(overlapping)
+
+    def applyMove(self, r1, c1, r2, c2, is_my_turn) -> None:
+        """
+        수를 보드에 적용하고 되돌리기 정보를 undo_stack에 쌓음
+        기록하는 것은 바뀐 칸의 이전 값(숫자, 소유자)과 유효 사각형 변화분뿐임
+        """
         if r1 == c1 == r2 == c2 == -1:
+            self.undo_stack.append(None)  # 패스도 undoMove와 짝을 맞추기 위해 기록
             return
+
+        # 이전 비트보드 3개(와 해시, 평가값)만 기록하면 상태를 모두 되돌릴 수 있음
+        record = (r1, c1, r2, c2, self.digit_bits, self.my_bits, self.opp_bits, self.hash, self.score)
+
+        mask = RECT_MASKS[rect_id(r1, c1, r2, c2)]
+        # 해시 갱신: 새로 지워진 칸, 소유자가 바뀐 칸의 키만 XOR
+        if is_my_turn:
+            gained, lost = mask & ~self.my_bits, mask & self.opp_bits
+            self.hash ^= (
+                _zobrist_xor(mask & self.digit_bits, ZOBRIST_CLEARED)
+                ^ _zobrist_xor(gained, ZOBRIST_MINE)
+                ^ _zobrist_xor(lost, ZOBRIST_OPP)
+            )
+        else:
+            gained, lost = mask & ~self.opp_bits, mask & self.my_bits
+            self.hash ^= (
+                _zobrist_xor(mask & self.digit_bits, ZOBRIST_CLEARED)
+                ^ _zobrist_xor(gained, ZOBRIST_OPP)
+                ^ _zobrist_xor(lost, ZOBRIST_MINE)
+            )
+
+        # 평가값 갱신: 새로 얻은 칸(gained)은 내 가치만큼, 빼앗은 칸(lost)은 상대 가치가 빠지므로 한 번 더
+        stolen = lost.bit_count()
+        delta = OWN_WEIGHT * (gained.bit_count() + stolen) + STEAL_WEIGHT * stolen
+        if CELL_WEIGHTS is not None:
+            delta += _weighted_sum(gained, CELL_WEIGHTS) + _weighted_sum(lost, CELL_WEIGHTS)
+        self.score += delta if is_my_turn else -delta
+
+        self.digit_bits &= ~mask  # 해당 칸 숫자는 사용했으므로 0 처리
+        if is_my_turn:
+            self.my_bits |= mask
+            self.opp_bits &= ~mask
+        else:
+            self.opp_bits |= mask
+            self.my_bits &= ~mask
+
+        width = c2 - c1 + 1
         for r in range(r1, r2 + 1):
-            for c in range(c1, c2 + 1):
-                self.board[r][c] = 0  # 해당 칸 숫자는 사용했으므로 0 처리
-                self.territory_board[r][c] = 1 if is_my_turn else -1
+            start = r * BOARD_COLUMN + c1
+            self.cells[start:start + width] = bytes(width)
+        self._patch_prefix(r1, c1, r2, c2)
+        removed, added = self._recheck_legal_moves(r1, c1, r2, c2)
+        self.undo_stack.append(record + (removed, added))
 
-    def restoreMove(self, r1, c1, r2, c2, original_board, original_territory_board) -> None:
-        # 이전 상태로 복구
-        if r1 == c1 == r2 == c2 == -1:
+    def undoMove(self) -> None:
+        # 가장 최근에 applyMove한 수를 되돌림
+        record = self.undo_stack.pop()
+        if record is None:
             return
+
+        r1, c1, r2, c2, digit_bits, my_bits, opp_bits, board_hash, score, removed, added = record
+        self.digit_bits = digit_bits
+        self.my_bits = my_bits
+        self.opp_bits = opp_bits
+        self.hash = board_hash
+        self.score = score
+
+        # 이 수로 지워진 칸(이전 digit_bits에 있던 칸)만 처음 숫자로 복구
+        cells, initial = self.cells, self.initial_cells
         for r in range(r1, r2 + 1):
-            for c in range(c1, c2 + 1):
-                self.board[r][c] = original_board[r][c]
-                self.territory_board[r][c] = original_territory_board[r][c]
+            base = r * BOARD_COLUMN
+            for i in range(base + c1, base + c2 + 1):
+                if digit_bits >> i & 1:
+                    cells[i] = initial[i]
+        self._patch_prefix(r1, c1, r2, c2)
+
+        # 바뀐 유효 사각형 집합과 위협 지도도 되돌림
+        self.legal_moves.difference_update(added)
+        self.legal_moves.update(removed)
+        for move_id in added:
+            self._cover(move_id, -1)
+        for move_id in removed:
+            self._cover(move_id, 1)
+
+
+def _install_trace_timers(cls):
+    # 계측용: 수 생성/평가 메서드를 시간 재는 래퍼로 감쌈 (계측이 켜졌을 때 클래스에 한 번만)
+    def timed(method, field):
+        def wrapper(self, *args):
+            begin = time.perf_counter()
+            try:
+                return method(self, *args)
+            finally:
+                if self.stats is not None:
+                    elapsed = time.perf_counter() - begin
+                    setattr(self.stats, field, getattr(self.stats, field) + elapsed)
+        return wrapper
+
+    cls._order_moves = timed(cls._order_moves, "movegen_time")
+    cls.applyMove = timed(cls.applyMove, "movegen_time")
+    cls.undoMove = timed(cls.undoMove, "movegen_time")
+    cls._calculate_board_value = timed(cls._calculate_board_value, "eval_time")
+
+
+if TRACE:
+    _install_trace_timers(Game)
+
+
+# 루트 분할 병렬 탐색 워커 상태 (워커 프로세스마다 하나씩)
+_worker_game = None
+_worker_alpha = None
+
+
+def _init_worker(board, shared_alpha):
+    # 워커 시작 시 한 번: 처음 보드로 Game 생성
+    global _worker_game, _worker_alpha
+    _worker_game = Game([row[:] for row in board], True)
+    _worker_alpha = shared_alpha
+
+
+def _search_root_chunk(played, move_ids, depth, deadline):
+    # 메인 프로세스가 실제로 둔 수 중 아직 반영하지 않은 것만 적용한 뒤 맡은 루트 수 탐색
+    # (워커의 Game은 수마다 이어서 쓰므로 치환표와 history도 그대로 남음)
+    game = _worker_game
+    for move in played[len(game.played):]:
+        game.updateMove(*move)
+    game.deadline = time.perf_counter() + (deadline - time.time())
+    return game._search_root_chunk(move_ids, depth, _worker_alpha)
+
+
+def _read_input(lines):
+    # stdin을 한 줄씩 읽어 큐에 넣음 (미리 탐색 중에도 명령이 오는 즉시 알 수 있도록)
+    for line in sys.stdin:
+        lines.put(line)
+    lines.put(None)  # 입력 종료
 
 
 def main():
+    global game
+    lines = queue.Queue()
+    threading.Thread(target=_read_input, args=(lines,), daemon=True).start()
+
     while True:
-        line = input().split()
+        raw = lines.get()
+        # 명령이 오면 미리 탐색을 멈추고 나서 처리
+        if "game" in globals():
+            game.stop_pondering()
+        if raw is None:
+            break
+        line = raw.split()
 
         if len(line) == 0:
             continue
@@ -175,8 +1601,9 @@ def main():
         if command == "INIT":
             # 게임 초기 보드 설정
             board = [list(map(int, row)) for row in param]
-            global game
             game = Game(board, first)
+            if WORKERS > 1 and ENGINE == "negamax":
+                game.start_workers(WORKERS)
             continue
 
         if command == "TIME":
@@ -185,6 +1612,9 @@ def main():
             ret = game.calculateMove(myTime, oppTime)
             game.updateMove(*ret, True)
             print(*ret, flush=True)
+            # 미리 탐색은 negamax 치환표를 채우는 것이라 MCTS나 병렬 탐색(워커가 각자 치환표 사용)에서는 안 함
+            if PONDER and ENGINE == "negamax" and game.pool is None:
+                game.start_pondering()
             continue
 
         if command == "OPP":
@@ -195,6 +1625,7 @@ def main():
 
         if command == "FINISH":
             # 게임 종료
+            game.stop_workers()
             break
 
         # 예외 처리
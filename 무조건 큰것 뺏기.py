@@ -1,3 +1,6 @@
+import heapq
+
+
 # ================================
 # Game 클래스: 게임 상태 관리
 # ================================
@@ -8,24 +11,119 @@ class Game:
         self.first = first            # 선공 여부
         self.passed = False           # 마지막 턴에 패스했는지 여부
 
+        rows, cols = len(board), len(board[0])
+        # 누적합 테이블 (isValid를 O(1)로 만들기 위함)
+        # sum_table[r][c]: (0,0) ~ (r-1,c-1) 구간의 숫자 합
+        # row_count[r][c]: r행의 0 ~ c-1열 중 숫자가 남은 칸 수
+        # col_count[c][r]: c열의 0 ~ r-1행 중 숫자가 남은 칸 수
+        self.sum_table = [[0] * (cols + 1) for _ in range(rows + 1)]
+        self.row_count = [[0] * (cols + 1) for _ in range(rows)]
+        self.col_count = [[0] * (rows + 1) for _ in range(cols)]
+        self._patch_prefix(0, 0, rows - 1, cols - 1)
+
+        # 최대 면적 사각형 힙: 면적이 큰 순서, 같으면 (r1, r2, c1, c2)가 작은 순서
+        # 처음에 한 번 채우고, 이후에는 수마다 새로 유효해진 사각형만 넣음 (무효가 된 항목은 꺼낼 때 버림)
+        self.area_heap = []
+        for rect in self._valid_rectangles():
+            self._push_area(rect)
+
+    def _patch_prefix(self, r1, c1, r2, c2):
+        """(r1, c1) ~ (r2, c2) 칸이 바뀐 뒤 영향을 받는 누적합 구간만 다시 계산"""
+        board = self.board
+        rows, cols = len(board), len(board[0])
+
+        # 행/열 누적합: 바뀐 행(열)의 c1(r1) 이후만 갱신
+        for r in range(r1, r2 + 1):
+            row = board[r]
+            counts = self.row_count[r]
+            acc = counts[c1]
+            for c in range(c1, cols):
+                if row[c] != 0:
+                    acc += 1
+                counts[c + 1] = acc
+        for c in range(c1, c2 + 1):
+            counts = self.col_count[c]
+            acc = counts[r1]
+            for r in range(r1, rows):
+                if board[r][c] != 0:
+                    acc += 1
+                counts[r + 1] = acc
+
+        # 2차원 누적합: (r1, c1)보다 오른쪽 아래 구간만 갱신
+        sum_table = self.sum_table
+        for r in range(r1, rows):
+            row = board[r]
+            prev_sum, cur_sum = sum_table[r], sum_table[r + 1]
+            line_sum = cur_sum[c1] - prev_sum[c1]
+            for c in range(c1, cols):
+                line_sum += row[c]
+                cur_sum[c + 1] = prev_sum[c + 1] + line_sum
+
     # 사각형 (r1, c1) ~ (r2, c2)이 유효한지 검사 (합이 10이고, 네 변을 모두 포함)
     def isValid(self, r1, c1, r2, c2):
-        sums = 0
-        r1fit = c1fit = r2fit = c2fit = False
-
-        for r in range(r1, r2 + 1):
-            for c in range(c1, c2 + 1):
-                if self.board[r][c] != 0:
-                    sums += self.board[r][c]
-                    if r == r1:
-                        r1fit = True
-                    if r == r2:
-                        r2fit = True
-                    if c == c1:
-                        c1fit = True
-                    if c == c2:
-                        c2fit = True
-        return sums == 10 and r1fit and r2fit and c1fit and c2fit
+        """누적합 테이블 기반 O(1) 유효성 검사"""
+        s = self.sum_table
+        if s[r2 + 1][c2 + 1] - s[r1][c2 + 1] - s[r2 + 1][c1] + s[r1][c1] != 10:
+            return False
+
+        # 네 변(위/아래 행, 왼/오른 열)에 숫자가 하나 이상 남아 있어야 함
+        top, bottom = self.row_count[r1], self.row_count[r2]
+        left, right = self.col_count[c1], self.col_count[c2]
+        return (
+            top[c2 + 1] != top[c1]
+            and bottom[c2 + 1] != bottom[c1]
+            and left[r2 + 1] != left[r1]
+            and right[r2 + 1] != right[r1]
+        )
+
+    def _valid_rectangles(self, r1=0, c1=0, r2=None, c2=None):
+        """
+        (r1, c1) ~ (r2, c2)와 겹치는 유효한 사각형 목록 (범위를 주지 않으면 보드 전체, 위 -> 아래 -> 왼 -> 오른 순서)
+        행 구간(top, bottom)마다 열별 합을 유지하며, left/right 두 포인터로 합이 정확히 10인 열 구간만 찾음
+        숫자가 모두 0 이상이므로 left가 커지면 합이 10 이상이 되는 right도 줄지 않음 -> O(R^2 * C)
+        왼/오른 변은 그 열의 구간 합이 0보다 크면 숫자가 있는 것이므로 위/아래 변만 따로 검사
+        (수를 둔 뒤에는 둔 칸과 겹치는 사각형만 유효성이 바뀔 수 있으므로 그 범위만 다시 구하면 됨)
+        """
+        board = self.board
+        rows, cols = len(board), len(board[0])
+        if r2 is None:
+            r2, c2 = rows - 1, cols - 1
+        row_count = self.row_count
+        rects = []
+        for top in range(r2 + 1):
+            col_sum = [0] * cols  # top ~ bottom행의 열별 합
+            top_count = row_count[top]
+            for bottom in range(top, rows):
+                row = board[bottom]
+                for c in range(cols):
+                    col_sum[c] += row[c]
+                if bottom < r1:
+                    continue
+                bottom_count = row_count[bottom]
+
+                right = 0  # 창은 left ~ right-1열
+                window = 0
+                for left in range(c2 + 1):
+                    while window < 10 and right < cols:
+                        window += col_sum[right]
+                        right += 1
+                    if window < 10:
+                        break
+                    # 합 10에 도달시킨 마지막 열(right-1)은 합이 0보다 크므로 오른 변은 항상 만족
+                    if (
+                        window == 10
+                        and right > c1
+                        and col_sum[left]
+                        and top_count[right] != top_count[left]
+                        and bottom_count[right] != bottom_count[left]
+                    ):
+                        rects.append((top, left, bottom, right - 1))
+                    window -= col_sum[left]
+        return rects
+
+    def _push_area(self, rect):
+        r1, c1, r2, c2 = rect
+        heapq.heappush(self.area_heap, (-(r2 - r1 + 1) * (c2 - c1 + 1), r1, r2, c1, c2))
 
     # ================================================================
     # ===================== [필수 구현] ===============================
@@ -34,27 +132,16 @@ class Game:
     # ================================================================
     def calculateMove(self, _myTime, _oppTime):
         """
-        보드 전체를 (r1, c1, r2, c2) 형태로 완전 탐색
-        self.isValid()로 합이 10이고 유효한 사각형인지 확인
-        면적을 계산하여 최대 면적 사각형을 갱신
+        최대 면적 힙의 맨 위를 반환
+        예전에는 매 턴 보드 전체를 (r1, c1, r2, c2)로 완전 탐색했으나, 같은 순서(면적 -> r1 -> r2 -> c1 -> c2)를 힙으로 유지함
         """
-        bestMove = (-1, -1, -1, -1)
-        maxArea = 0
-
-        rows = len(self.board)
-        cols = len(self.board[0]) if self.board else 0
-
-        for r1 in range(rows):
-            for r2 in range(r1, rows):
-                for c1 in range(cols):
-                    for c2 in range(c1, cols):
-                        if self.isValid(r1, c1, r2, c2):
-                            area = (r2 - r1 + 1) * (c2 - c1 + 1)
-                            if area > maxArea:
-                                maxArea = area
-                                bestMove = (r1, c1, r2, c2)
-
-        return bestMove
+        heap = self.area_heap
+        while heap:
+            _, r1, r2, c1, c2 = heap[0]
+            if self.isValid(r1, c1, r2, c2):
+                return (r1, c1, r2, c2)
+            heapq.heappop(heap)
+        return (-1, -1, -1, -1)
     # =================== [필수 구현 끝] =============================
 
     # 상대방의 수를 받아 보드에 반영
@@ -69,6 +156,11 @@ class Game:
         for r in range(r1, r2 + 1):
             for c in range(c1, c2 + 1):
                 self.board[r][c] = 0
+        self._patch_prefix(r1, c1, r2, c2)
+
+        # 새로 유효해졌을 수 있는 사각형(둔 칸과 겹치는 것)만 힙에 넣음 (이미 있던 것은 중복돼도 무방)
+        for rect in self._valid_rectangles(r1, c1, r2, c2):
+            self._push_area(rect)
         self.passed = False
 
 